@@ -11,23 +11,161 @@ This agent has its own LLM and can use multiple internal tools to:
 
 from langchain.tools import tool
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, ToolMessage
-from datetime import datetime
-from constants import get_llm, ACCOMMODATIONS_DATA
+from langchain_core.messages import HumanMessage
+import sys
+from datetime import date
+from functools import lru_cache
+from agent_loop import final_answer, run_tool_calls
+from constants import (
+    get_llm,
+    LLM_MODEL_FAST,
+    ACCOMMODATIONS_DATA,
+    ACCOMMODATIONS_BY_CITY,
+    ACCOMMODATIONS_BY_CITY_TYPE,
+    ACCOMMODATIONS_BY_RATING,
+    ACCOMMODATIONS_BY_PRICE,
+    ACCOMMODATIONS_BY_VALUE,
+)
 
 
 # ============================================
-# HELPER FUNCTION
+# HELPER FUNCTIONS
 # ============================================
 
+# Compact table row for every hotel, built once and split around the price
+# column, which depends on the number of nights. Columns:
+# id|name|type|price per night (total)|rating|location|amenities|description
+_HOTEL_ROWS = {
+    h.id: (
+        f"{h.id}|{h.name}|{h.type}|",
+        h.price_per_night,
+        f"|★{h.rating}|{h.location}|{', '.join(h.amenities)}|{h.description}"
+    )
+    for h in ACCOMMODATIONS_DATA
+}
+
+# Recommendation text per hotel, built once: the details block split around
+# the price line (which depends on the number of nights), and the one-line
+# summary used when the hotel is listed as an alternative
+_HOTEL_DETAILS = {
+    h.id: (
+        f"🏨 RECOMMENDED ACCOMMODATION: {h.name}\n\n"
+        f"**Key Details:**\n"
+        f"- Type: {h.type}\n"
+        f"- Location: {h.location}, {h.city}\n"
+        f"- Rating: ★{h.rating}",
+        f"- Amenities: {', '.join(h.amenities)}\n"
+        f"- {h.description}"
+    )
+    for h in ACCOMMODATIONS_DATA
+}
+_HOTEL_SUMMARY_LINES = {
+    h.id: f"- {h.name} ({h.type}): ${h.price_per_night}/night, ★{h.rating}"
+    for h in ACCOMMODATIONS_DATA
+}
+
+# Lowercased amenities per hotel for filter_by_amenities
+_AMENITIES_LOWER = {
+    h.id: tuple(sys.intern(a.lower()) for a in h.amenities)
+    for h in ACCOMMODATIONS_DATA
+}
+
+# Inverted index: (lowercased city, amenity word or full phrase) -> hotel ids
+_AMENITY_INDEX = {}
+for _hotel in ACCOMMODATIONS_DATA:
+    _city_key = sys.intern(_hotel.city.lower())
+    for _amenity in _AMENITIES_LOWER[_hotel.id]:
+        for _token in {_amenity, *map(sys.intern, _amenity.split())}:
+            _AMENITY_INDEX.setdefault((_city_key, _token), set()).add(_hotel.id)
+
+
+def _search_response(hotels, nights: int, error: str, **meta) -> dict:
+    """Shared tool response: a compact table of the top 5 hotels, or an error.
+    
+    One hotel per line, pipe-delimited, so the LLM reads far fewer tokens
+    than the repr of a list of dicts.
+    """
+    if not hotels:
+        return {"table": "", "error": error}
+    
+    table = _hotel_table(tuple(h.id for h in hotels[:5]), nights)
+    
+    return {"table": table, "nights": nights, **meta}
+
+
+@lru_cache(maxsize=4096)
+def _hotel_table(hotel_ids: tuple, nights: int) -> str:
+    """Format the table for these hotels and stay length (memoized: same query, same string)."""
+    rows = []
+    for hotel_id in hotel_ids:
+        head, price, tail = _HOTEL_ROWS[hotel_id]
+        rows.append(f"{head}${price}/night (${price * nights} total){tail}")
+    return "\n".join(rows)
+
+
+def _format_recommendation(hotels, destination: str, nights: int, reason: str) -> str:
+    """Format the first of the ranked hotels as a recommendation, without the LLM."""
+    if not hotels:
+        return f"No accommodations found in {destination}."
+    
+    best = hotels[0]
+    head, tail = _HOTEL_DETAILS[best.id]
+    lines = [
+        head,
+        f"- Price: ${best.price_per_night}/night (${best.price_per_night * nights} total for {nights} nights)",
+        tail,
+        "",
+        f"**Why this choice:** {reason}",
+    ]
+    
+    alternatives = hotels[1:3]
+    if alternatives:
+        lines += ["", "**Other options:**"]
+        lines += [_HOTEL_SUMMARY_LINES[h.id] for h in alternatives]
+    
+    return "\n".join(lines)
+
+
+# Preferences whose tool choice is fixed: ranking to use and the reason shown to the user
+_DIRECT_PREFERENCES = {
+    "balanced": (ACCOMMODATIONS_BY_VALUE, "Best balance of guest rating and nightly price in the city."),
+    "cheapest": (ACCOMMODATIONS_BY_PRICE, "Lowest nightly price in the city."),
+    "luxury": (ACCOMMODATIONS_BY_RATING, "Highest guest rating in the city."),
+}
+
+# Accommodation types present in the data (e.g. 'resort', 'hostel', 'apartment')
+_HOTEL_TYPES = {hotel_type for _, hotel_type in ACCOMMODATIONS_BY_CITY_TYPE}
+
+
+def _direct_ranking(preferences: str, destination: str):
+    """Return (ranked hotels, reason) for a trivial preference, or None if the LLM is needed."""
+    preference = preferences.strip().lower()
+    city_key = destination.lower()
+    
+    if preference in _DIRECT_PREFERENCES:
+        ranking, reason = _DIRECT_PREFERENCES[preference]
+        return ranking.get(city_key, []), reason
+    
+    if preference in _HOTEL_TYPES:
+        # Best-rated of the requested type; with no match, let the LLM explain and suggest alternatives
+        # Presorted by rating (highest first)
+        hotels = ACCOMMODATIONS_BY_CITY_TYPE.get((city_key, preference))
+        if hotels:
+            return hotels, f"Highest-rated {preference} in the city."
+    
+    return None
+
+
+@lru_cache(maxsize=1024)
 def _calculate_nights(check_in: str, check_out: str) -> int:
     """Calculate number of nights between dates."""
     try:
-        check_in_date = datetime.strptime(check_in, "%Y-%m-%d")
-        check_out_date = datetime.strptime(check_out, "%Y-%m-%d")
+        # Fixed YYYY-MM-DD format, so skip strptime's format parser
+        check_in_date = date(*map(int, check_in.split('-')))
+        check_out_date = date(*map(int, check_out.split('-')))
         nights = (check_out_date - check_in_date).days
         return nights if nights > 0 else 3
-    except:
+    except (ValueError, TypeError):
         return 3
 
 
@@ -48,36 +186,14 @@ def search_hotels_by_rating(destination: str, check_in: str, check_out: str, gue
         guests: Number of guests
         
     Returns:
-        dict: Hotels sorted by rating
+        dict: Table of hotels sorted by rating
     """
     nights = _calculate_nights(check_in, check_out)
     
-    matching_hotels = [
-        h for h in ACCOMMODATIONS_DATA
-        if h['city'].lower() == destination.lower()
-    ]
-    
-    if not matching_hotels:
-        return {"hotels": [], "error": "No hotels found"}
+    # Presorted by rating (highest first)
+    sorted_hotels = ACCOMMODATIONS_BY_RATING.get(destination.lower(), [])
     
-    # Sort by rating (highest first)
-    sorted_hotels = sorted(matching_hotels, key=lambda x: x['rating'], reverse=True)
-    
-    results = []
-    for hotel in sorted_hotels[:5]:
-        results.append({
-            "id": hotel['id'],
-            "name": hotel['name'],
-            "type": hotel['type'],
-            "price_per_night": hotel['price_per_night'],
-            "total_price": hotel['price_per_night'] * nights,
-            "rating": hotel['rating'],
-            "location": hotel['location'],
-            "amenities": hotel['amenities'],
-            "description": hotel['description']
-        })
-    
-    return {"hotels": results, "nights": nights, "sort_by": "rating"}
+    return _search_response(sorted_hotels, nights, "No hotels found", sort_by="rating")
 
 
 @tool
@@ -93,36 +209,14 @@ def search_hotels_by_price(destination: str, check_in: str, check_out: str, gues
         guests: Number of guests
         
     Returns:
-        dict: Hotels sorted by price
+        dict: Table of hotels sorted by price
     """
     nights = _calculate_nights(check_in, check_out)
     
-    matching_hotels = [
-        h for h in ACCOMMODATIONS_DATA
-        if h['city'].lower() == destination.lower()
-    ]
-    
-    if not matching_hotels:
-        return {"hotels": [], "error": "No hotels found"}
-    
-    # Sort by price (cheapest first)
-    sorted_hotels = sorted(matching_hotels, key=lambda x: x['price_per_night'])
-    
-    results = []
-    for hotel in sorted_hotels[:5]:
-        results.append({
-            "id": hotel['id'],
-            "name": hotel['name'],
-            "type": hotel['type'],
-            "price_per_night": hotel['price_per_night'],
-            "total_price": hotel['price_per_night'] * nights,
-            "rating": hotel['rating'],
-            "location": hotel['location'],
-            "amenities": hotel['amenities'],
-            "description": hotel['description']
-        })
+    # Presorted by price (cheapest first)
+    sorted_hotels = ACCOMMODATIONS_BY_PRICE.get(destination.lower(), [])
     
-    return {"hotels": results, "nights": nights, "sort_by": "price"}
+    return _search_response(sorted_hotels, nights, "No hotels found", sort_by="price")
 
 
 @tool
@@ -139,34 +233,16 @@ def filter_by_hotel_type(destination: str, hotel_type: str, check_in: str, check
         guests: Number of guests
         
     Returns:
-        dict: Hotels matching the specified type
+        dict: Table of hotels matching the specified type
     """
     nights = _calculate_nights(check_in, check_out)
     
-    matching_hotels = [
-        h for h in ACCOMMODATIONS_DATA
-        if h['city'].lower() == destination.lower() and
-           h['type'].lower() == hotel_type.lower()
-    ]
-    
-    if not matching_hotels:
-        return {"hotels": [], "error": f"No {hotel_type} accommodations found"}
-    
-    results = []
-    for hotel in matching_hotels[:5]:
-        results.append({
-            "id": hotel['id'],
-            "name": hotel['name'],
-            "type": hotel['type'],
-            "price_per_night": hotel['price_per_night'],
-            "total_price": hotel['price_per_night'] * nights,
-            "rating": hotel['rating'],
-            "location": hotel['location'],
-            "amenities": hotel['amenities'],
-            "description": hotel['description']
-        })
+    matching_hotels = ACCOMMODATIONS_BY_CITY_TYPE.get((destination.lower(), hotel_type.lower()), [])
     
-    return {"hotels": results, "nights": nights, "filter": f"{hotel_type}_type"}
+    return _search_response(
+        matching_hotels, nights, f"No {hotel_type} accommodations found",
+        filter=f"{hotel_type}_type"
+    )
 
 
 @tool
@@ -183,73 +259,56 @@ def filter_by_amenities(destination: str, required_amenities: str, check_in: str
         guests: Number of guests
         
     Returns:
-        dict: Hotels with all required amenities
+        dict: Table of hotels with all required amenities
     """
     nights = _calculate_nights(check_in, check_out)
     required = [a.strip().lower() for a in required_amenities.split(',')]
     
-    matching_hotels = [
-        h for h in ACCOMMODATIONS_DATA
-        if h['city'].lower() == destination.lower() and
-           all(any(req in amenity.lower() for amenity in h['amenities']) for req in required)
-    ]
-    
-    if not matching_hotels:
-        return {"hotels": [], "error": f"No hotels with {required_amenities}"}
+    city_key = destination.lower()
+    city_hotels = ACCOMMODATIONS_BY_CITY.get(city_key, [])
+    
+    # Intersect posting lists; fall back to a substring scan for tokens the index doesn't know
+    matching_ids = {h.id for h in city_hotels}
+    for req in required:
+        posting = _AMENITY_INDEX.get((city_key, req))
+        if posting is None:
+            posting = {
+                h.id for h in city_hotels
+                if any(req in amenity for amenity in _AMENITIES_LOWER[h.id])
+            }
+        matching_ids &= posting
     
-    results = []
-    for hotel in matching_hotels[:5]:
-        results.append({
-            "id": hotel['id'],
-            "name": hotel['name'],
-            "type": hotel['type'],
-            "price_per_night": hotel['price_per_night'],
-            "total_price": hotel['price_per_night'] * nights,
-            "rating": hotel['rating'],
-            "location": hotel['location'],
-            "amenities": hotel['amenities'],
-            "description": hotel['description']
-        })
+    matching_hotels = [h for h in city_hotels if h.id in matching_ids]
     
-    return {"hotels": results, "nights": nights, "filter": f"amenities_{required_amenities}"}
+    return _search_response(
+        matching_hotels, nights, f"No hotels with {required_amenities}",
+        filter=f"amenities_{required_amenities}"
+    )
 
 
 # ============================================
-# ACCOMMODATION AGENT (Exposed to supervisor as tool)
+# AGENT PIPELINE (Built once, reused across calls)
 # ============================================
 
-@tool
-def accommodation_agent(destination: str, check_in: str, check_out: str, guests: str = "1", preferences: str = "balanced"):
-    """AI-powered hotel booking specialist with intelligent search.
-    
-    Uses multiple search strategies and AI reasoning to find the best accommodation.
-    
-    Use this agent when you need to find hotels/accommodations for the user.
-    
-    Args:
-        destination: City to search in (e.g., 'Paris', 'Tokyo', 'New York')
-        check_in: Check-in date in YYYY-MM-DD format
-        check_out: Check-out date in YYYY-MM-DD format
-        guests: Number of guests (default: '1')
-        preferences: User preference - 'cheapest', 'luxury', 'resort', 'boutique', 'balanced', or amenities like 'pool,gym'
-        
-    Returns:
-        str: AI-generated hotel recommendation with reasoning
-    """
-    # Create sub-agent with its own LLM
-    llm = get_llm()
-    
-    # Define internal tools this agent can use
-    hotel_tools = [
-        search_hotels_by_rating,
-        search_hotels_by_price,
-        filter_by_hotel_type,
-        filter_by_amenities
-    ]
-    
-    # Agent's system prompt
-    agent_prompt = ChatPromptTemplate.from_messages([
-        ("system", f"""You are an expert Hotel Booking Specialist with intelligent search capabilities.
+_HOTEL_TOOLS = [
+    search_hotels_by_rating,
+    search_hotels_by_price,
+    filter_by_hotel_type,
+    filter_by_amenities
+]
+
+# Map tool names to functions
+_TOOL_MAP = {
+    "search_hotels_by_rating": search_hotels_by_rating,
+    "search_hotels_by_price": search_hotels_by_price,
+    "filter_by_hotel_type": filter_by_hotel_type,
+    "filter_by_amenities": filter_by_amenities
+}
+
+# Agent's system prompt - fully static so every call shares the same prompt prefix;
+# per-call details (destination, dates, preferences) go in the task message
+_AGENT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert Hotel Booking Specialist with intelligent search capabilities.
 
 Your internal tools:
 - search_hotels_by_rating: Find highest rated hotels
@@ -257,9 +316,10 @@ Your internal tools:
 - filter_by_hotel_type: Filter by type (Hotel, Resort, Boutique, Hostel, Apartment)
 - filter_by_amenities: Filter by amenities (WiFi, Pool, Gym, etc.)
 
-User preference: {preferences}
+Tool results come back as a "table" with one hotel per line:
+id|name|type|price per night (total for the stay)|rating|location|amenities|description
 
-Your strategy based on preference:
+Your strategy based on the user preference given in the task:
 - 'cheapest': Use search_hotels_by_price
 - 'luxury': Use search_hotels_by_rating
 - 'resort', 'boutique', 'hotel': Use filter_by_hotel_type
@@ -273,11 +333,48 @@ Process:
 4. Format as a professional recommendation
 
 Be smart about tool selection!"""),
-        ("placeholder", "{messages}")
-    ])
+    ("placeholder", "{messages}")
+])
+
+
+@lru_cache(maxsize=1)
+def _get_agent():
+    """Bind the hotel tools to the LLM once and reuse the runnable."""
+    return _AGENT_PROMPT | get_llm(LLM_MODEL_FAST).bind_tools(_HOTEL_TOOLS, parallel_tool_calls=True)
+
+
+# ============================================
+# ACCOMMODATION AGENT (Exposed to supervisor as tool)
+# ============================================
+
+@tool
+def accommodation_agent(destination: str, check_in: str, check_out: str, guests: str = "1", preferences: str = "balanced"):
+    """AI-powered hotel booking specialist with intelligent search.
+    
+    Uses multiple search strategies and AI reasoning to find the best accommodation.
     
-    # Bind tools to agent's LLM
-    agent = agent_prompt | llm.bind_tools(hotel_tools)
+    Use this agent when you need to find hotels/accommodations for the user.
+    
+    Args:
+        destination: City to search in (e.g., 'Paris', 'Tokyo', 'New York')
+        check_in: Check-in date in YYYY-MM-DD format
+        check_out: Check-out date in YYYY-MM-DD format
+        guests: Number of guests (default: '1')
+        preferences: User preference - 'cheapest', 'luxury', 'resort', 'boutique', 'balanced', or amenities like 'pool,gym'
+        
+    Returns:
+        str: AI-generated hotel recommendation with reasoning
+    """
+    # Single-keyword preferences map to a fixed ranking, so answer them without the LLM
+    direct = _direct_ranking(preferences, destination)
+    if direct is not None:
+        hotels, reason = direct
+        print(f"  ⚡ Accommodation Agent answering '{preferences}' from precomputed rankings (no LLM call)")
+        nights = _calculate_nights(check_in, check_out)
+        return _format_recommendation(hotels, destination, nights, reason)
+    
+    # Sub-agent with its own LLM (built on first use, then shared)
+    agent = _get_agent()
     
     # Create the agent's task
     task = HumanMessage(
@@ -292,6 +389,9 @@ Use your tools wisely to find the optimal accommodation."""
     messages = [task]
     max_iterations = 5
     
+    # Serialized tool results for this run (see run_tool_calls)
+    call_cache = {}
+    
     print(f"  💭 Accommodation Agent starting ReAct loop (max {max_iterations} iterations)...")
     
     for iteration in range(max_iterations):
@@ -306,38 +406,15 @@ Use your tools wisely to find the optimal accommodation."""
             print(f"  ✅ Accommodation Agent finished reasoning - no more tools needed")
             break
         
-        # Execute all tool calls
+        # Execute all tool calls - they are in-memory lookups, so run them inline
         print(f"  📞 Accommodation Agent decided to call {len(result.tool_calls)} internal tool(s):")
-        for tool_call in result.tool_calls:
-            tool_name = tool_call['name']
-            tool_args = tool_call['args']
-            
-            print(f"     🔨 Calling: {tool_name}")
-            print(f"        Args: {tool_args}")
-            
-            # Map tool names to functions
-            tool_map = {
-                "search_hotels_by_rating": search_hotels_by_rating,
-                "search_hotels_by_price": search_hotels_by_price,
-                "filter_by_hotel_type": filter_by_hotel_type,
-                "filter_by_amenities": filter_by_amenities
-            }
-            
-            if tool_name in tool_map:
-                tool_result = tool_map[tool_name].invoke(tool_args)
-                print(f"     ✓ {tool_name} returned results")
-                
-                # Add tool result to conversation
-                messages.append(
-                    ToolMessage(
-                        content=str(tool_result),
-                        tool_call_id=tool_call['id'],
-                        name=tool_name
-                    )
-                )
+        messages += run_tool_calls(result.tool_calls, _TOOL_MAP, call_cache, nudge=iteration < max_iterations - 1)
     
     # Get the agent's final recommendation
-    final_response = messages[-1].content if messages else "No hotels found"
+    final_response = final_answer(
+        messages,
+        f"No hotel recommendation for {destination}: the search did not finish within {max_iterations} steps."
+    )
     
     return final_response
 
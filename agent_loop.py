@@ -0,0 +1,72 @@
+"""
+Shared ReAct loop steps for the LLM-powered specialist agents.
+Runs one turn of internal tool calls with a per-run result cache, and
+picks the agent's final answer once the loop ends.
+"""
+
+import json
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+
+# Sent when every tool call in a turn was already answered: the model is looping
+FINAL_ANSWER_NUDGE = "You already have all the data you need. Do not call any more tools - write your final response now."
+
+
+def run_tool_calls(tool_calls, tool_map, call_cache: dict, nudge: bool = True) -> list:
+    """
+    Execute one turn of internal tool calls and return the messages to append.
+    
+    Results are serialized once as JSON (valid and compact for the LLM, unlike
+    a dict repr) and kept in call_cache for the whole run, keyed by tool name
+    and args, so repeating a call is free. If every call in the turn was a
+    repeat, nothing new was learned: a nudge asking for the final answer is
+    appended, unless nudge is False (e.g. on the last iteration).
+    """
+    messages = []
+    repeated = 0
+    
+    for tool_call in tool_calls:
+        tool_name = tool_call['name']
+        tool_args = tool_call['args']
+        
+        print(f"     🔨 Calling: {tool_name}")
+        print(f"        Args: {tool_args}")
+        
+        if tool_name not in tool_map:
+            continue
+        
+        cache_key = (tool_name, json.dumps(tool_args, sort_keys=True))
+        if cache_key in call_cache:
+            print(f"     ♻️  {tool_name} reusing cached results")
+            repeated += 1
+        else:
+            call_cache[cache_key] = json.dumps(tool_map[tool_name].invoke(tool_args), ensure_ascii=False)
+            print(f"     ✓ {tool_name} returned results")
+        
+        messages.append(
+            ToolMessage(
+                content=call_cache[cache_key],
+                tool_call_id=tool_call['id'],
+                name=tool_name
+            )
+        )
+    
+    # Nothing new was fetched this turn - stop the loop from spinning on the same calls
+    if nudge and repeated == len(tool_calls):
+        print(f"  ⏭️  Only repeated tool calls - asking for the final answer")
+        messages.append(HumanMessage(content=FINAL_ANSWER_NUDGE))
+    
+    return messages
+
+
+def final_answer(messages: list, fallback: str) -> str:
+    """
+    The agent's final answer: its last message, if that is a reply with no
+    tool calls. A loop that hit max_iterations ends on tool results (raw JSON)
+    instead, so the fallback is returned.
+    """
+    last = messages[-1] if messages else None
+    if isinstance(last, AIMessage) and not last.tool_calls and last.content:
+        return last.content
+    print(f"  ⚠️  No final answer from the agent - returning fallback")
+    return fallback
@@ -16,6 +16,8 @@ INSTRUCTIONS:
 6. Update supervisor.py and agents.py to register
 """
 
+import heapq
+import json
 from langchain.tools import tool
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, ToolMessage
@@ -91,10 +93,10 @@ def internal_tool_3(param1: str):
     # TODO: Implement tool logic
     results = [item for item in TEMPLATE_DATA if param1.lower() in str(item).lower()]
     
-    # Sort or process results
-    sorted_results = sorted(results, key=lambda x: x.get('score', 0), reverse=True)
+    # Keep only the top 5 (heapq avoids sorting the whole list)
+    top_results = heapq.nlargest(5, results, key=lambda x: x.get('score', 0))
     
-    return {"results": sorted_results[:5], "tool": "tool_3"}
+    return {"results": top_results, "tool": "tool_3"}
 
 
 # ============================================
@@ -209,7 +211,7 @@ Use your tools wisely to find the optimal solution."""
                 # Add tool result to conversation
                 messages.append(
                     ToolMessage(
-                        content=str(tool_result),
+                        content=json.dumps(tool_result, ensure_ascii=False),
                         tool_call_id=tool_call['id'],
                         name=tool_name
                     )
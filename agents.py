@@ -4,16 +4,24 @@ Supervisor coordinates specialist agents via tool calls (ReAct pattern).
 """
 
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from typing import List, TypedDict, Annotated
+from langchain_core.pydantic_v1 import PrivateAttr
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import operator
+import re
+import threading
+import uuid
 
 # Import specialist agent tools
 # from flight_agent import flight_agent
 from accommodation_agent import accommodation_agent
 from itinerary_agent import itinerary_agent
 from budget_agent import budget_agent
-from supervisor import create_supervisor
+from supervisor import create_supervisor, parse_request
+from constants import USE_LLM_SUPERVISOR, enable_llm_cache
 
 
 # ============================================
@@ -38,10 +46,49 @@ TOOL_MAP = {
 }
 
 
+@lru_cache(maxsize=4096)
+def _invoke_agent(name: str, args: tuple) -> str:
+    """
+    Run a specialist agent, cached by name and arguments.
+    Repeated calls (supervisor retries, popular destinations) skip the agent entirely.
+    """
+    return str(TOOL_MAP[name].invoke(dict(args)))
+
+
+def _agent_args(args: dict) -> tuple:
+    """Hashable cache key for tool call args, ignoring stray whitespace."""
+    return tuple(sorted(
+        (key, value.strip() if isinstance(value, str) else value)
+        for key, value in args.items()
+    ))
+
+
+# Earlier-turn messages (user requests and final answers) shown to the supervisor
+SUPERVISOR_HISTORY = 6
+
+# Conversations kept by the in-memory checkpointer (least recently saved are evicted)
+CHECKPOINT_THREADS = 500
+
+
 # ============================================
 # GRAPH NODES
 # ============================================
 
+def _supervisor_messages(messages):
+    """
+    The current turn in full, plus a window of earlier conversation.
+    Earlier tool calls and results are dropped (their content is in the final
+    answers), so the supervisor's prompt stops growing with every turn.
+    """
+    turn = _current_turn(messages)
+    earlier = messages[:len(messages) - len(turn)]
+    history = [
+        m for m in earlier
+        if isinstance(m, HumanMessage) or (isinstance(m, AIMessage) and not m.tool_calls)
+    ]
+    return history[-SUPERVISOR_HISTORY:] + turn
+
+
 def supervisor_node(state: TravelState):
     """
     Supervisor agent reasons about the request and calls specialist agents.
@@ -51,8 +98,21 @@ def supervisor_node(state: TravelState):
     print("🧠 SUPERVISOR REASONING...")
     print("="*60)
     
+    # Plain trip requests are parsed directly, skipping the LLM call
+    last_message = state['messages'][-1]
+    if isinstance(last_message, HumanMessage):
+        calls = parse_request(last_message.content)
+        if calls:
+            print("\n⚡ Request parsed without LLM, calling agents:")
+            tool_calls = []
+            for name, args in calls:
+                print(f"   → {name}")
+                print(f"      Args: {args}")
+                tool_calls.append({"name": name, "args": args, "id": f"{name}_{len(state['messages'])}"})
+            return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+    
     supervisor = create_supervisor()
-    result = supervisor.invoke({"messages": state['messages']})
+    result = supervisor.invoke({"messages": _supervisor_messages(state['messages'])})
     
     # Show what supervisor decided
     if hasattr(result, 'tool_calls') and result.tool_calls:
@@ -70,6 +130,10 @@ def tool_node(state: TravelState):
     """
     Execute tool calls from supervisor.
     This is the ACTING step in the ReAct pattern - executing specialist agents.
+    
+    Tool calls issued in the same supervisor turn are independent (e.g. hotels
+    and itinerary), so they run concurrently: the step takes as long as the
+    slowest agent instead of the sum of all of them.
     """
     last_message = state['messages'][-1]
     
@@ -77,33 +141,204 @@ def tool_node(state: TravelState):
     tool_messages = []
     
     if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-        for tool_call in last_message.tool_calls:
-            tool_name = tool_call['name']
-            tool_args = tool_call['args']
-            
+        tool_calls = [tc for tc in last_message.tool_calls if tc['name'] in TOOL_MAP]
+        
+        for tool_call in tool_calls:
             print(f"\n{'─'*60}")
-            print(f"🔧 EXECUTING: {tool_name.upper()}")
+            print(f"🔧 EXECUTING: {tool_call['name'].upper()}")
             print(f"{'─'*60}")
+        
+        # Execute the specialist agent tools concurrently; identical calls in the
+        # same turn run once (the result cache is only filled after they finish)
+        calls = [(tc['name'], _agent_args(tc['args'])) for tc in tool_calls]
+        with ThreadPoolExecutor(max_workers=max(len(set(calls)), 1)) as executor:
+            futures = {
+                call: executor.submit(_invoke_agent, *call)
+                for call in dict.fromkeys(calls)
+            }
+        
+        # Create tool messages with results in the original order (OBSERVATION step in ReAct),
+        # one per tool_call_id even when a duplicate call shares its result
+        for tool_call, call in zip(tool_calls, calls):
+            result = futures[call].result()
+            
+            print(f"✅ {tool_call['name']} completed")
+            print(f"{'─'*60}\n")
             
-            # Execute the specialist agent tool
-            if tool_name in TOOL_MAP:
-                result = TOOL_MAP[tool_name].invoke(tool_args)
-                
-                print(f"✅ {tool_name} completed")
-                print(f"{'─'*60}\n")
-                
-                # Create tool message with result (OBSERVATION step in ReAct)
-                tool_messages.append(
-                    ToolMessage(
-                        content=str(result),
-                        tool_call_id=tool_call['id'],
-                        name=tool_name
-                    )
+            tool_messages.append(
+                ToolMessage(
+                    content=result,
+                    tool_call_id=tool_call['id'],
+                    name=tool_call['name']
                 )
+            )
     
     return {"messages": tool_messages}
 
 
+# Cost patterns in the specialist agents' output
+_HOTEL_TOTAL_RE = re.compile(r"\$([\d,]+)\s*total")
+_ACTIVITIES_TOTAL_RE = re.compile(r"Total Activities Cost:\**\s*\$([\d,]+)")
+
+# The recommended hotel's section: from its heading (or the start) up to the
+# list of alternatives, so another hotel's total is never costed by mistake
+_RECOMMENDED_RE = re.compile(r"recommended", re.IGNORECASE)
+_ALTERNATIVES_RE = re.compile(r"other options|alternatives", re.IGNORECASE)
+
+
+def _hotel_total(text: str):
+    """The recommended hotel's total for the stay ('1350'), or None if not found."""
+    start = _RECOMMENDED_RE.search(text)
+    section = text[start.start():] if start else text
+    end = _ALTERNATIVES_RE.search(section)
+    match = _HOTEL_TOTAL_RE.search(section[:end.start()] if end else section)
+    return match.group(1).replace(',', '') if match else None
+
+# Explicit budget amounts in the user's request: "budget (of/is/:) 1500" (at
+# least $100), or a currency-marked amount ("$1,500", "USD 2000", "$1.5k",
+# "2000 SGD", "1500 dollars"). Bare small numbers ("a budget trip for 4 days"),
+# counts of days/nights/people and per-night or per-person prices never match.
+_NOT_A_COUNT = (
+    r"(?![\d,]|\.\d|\s*-?\s*(?:days?|nights?|people|persons|guests|adults|pax)\b"
+    r"|\s*(?:/|per\s+|a\s+)(?:day|night|person|pax)\b)"
+)
+_AMOUNT = r"(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)(\s*k\b)?"
+_USER_BUDGET_RES = (
+    re.compile(
+        r"\bbudget\s*(?:of|is|:|=)?\s*(?:about|around|roughly|approximately|~)?\s*"
+        r"(?:[$€£]|usd|sgd)?\s*" + _AMOUNT + _NOT_A_COUNT,
+        re.IGNORECASE
+    ),
+    re.compile(r"(?:[$€£]|\b(?:usd|sgd)\b)\s*" + _AMOUNT + _NOT_A_COUNT, re.IGNORECASE),
+    re.compile(r"\b" + _AMOUNT + r"\s*(?:usd|sgd|dollars?|bucks)\b", re.IGNORECASE),
+)
+
+
+def _user_budget(text: str) -> str:
+    """The budget stated in the user's request as a whole-dollar string, or '0' if none."""
+    for pattern in _USER_BUDGET_RES:
+        for match in pattern.finditer(text):
+            amount = float(match.group(1).replace(',', ''))
+            if match.group(2):
+                amount *= 1000
+            # "budget 15" is more likely a count than a dollar amount
+            if pattern is _USER_BUDGET_RES[0] and amount < 100:
+                continue
+            return str(int(amount))
+    return "0"
+
+
+def _current_turn(messages):
+    """Messages since the latest user message (the checkpointer keeps earlier turns)."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index:]
+    return messages
+
+
+# Daily spending level for budget_agent, from the accommodation preference
+_BUDGET_LEVELS = {
+    "cheapest": "budget",
+    "budget": "budget",
+    "hostel": "budget",
+    "luxury": "luxury",
+}
+
+
+def _budget_args(messages):
+    """
+    Build budget_agent arguments from the hotel and itinerary results.
+    Returns None if budget_agent already ran or a cost can't be found,
+    in which case the supervisor decides what to do next.
+    """
+    calls = {}
+    results = {}
+    messages = _current_turn(messages)
+    user_request = messages[0].content if messages else ""
+    for message in messages:
+        for tool_call in getattr(message, 'tool_calls', None) or []:
+            calls[tool_call['name']] = tool_call['args']
+        if isinstance(message, ToolMessage):
+            results[message.name] = message.content
+    
+    if "budget_agent" in results:
+        return None
+    if "accommodation_agent" not in results or "itinerary_agent" not in results:
+        return None
+    
+    hotel_cost = _hotel_total(results["accommodation_agent"])
+    activities = _ACTIVITIES_TOTAL_RE.search(results["itinerary_agent"])
+    num_days = str(calls.get("itinerary_agent", {}).get("num_days", "")).strip()
+    preference = str(calls.get("accommodation_agent", {}).get("preferences", "")).strip().lower()
+    if not hotel_cost or not activities or not num_days.isdigit():
+        return None
+    
+    return {
+        "hotel_cost": hotel_cost,
+        "num_days": num_days,
+        "activities_cost": activities.group(1).replace(',', ''),
+        "user_budget": _user_budget(user_request),
+        "budget_level": _BUDGET_LEVELS.get(preference, "moderate"),
+    }
+
+
+def budget_node(state: TravelState):
+    """
+    Call budget_agent directly once hotel and itinerary costs are known.
+    
+    This saves a supervisor round-trip whose only job would be to copy the
+    costs into a budget_agent call. The call is recorded as a normal tool
+    call/result pair so the supervisor sees the same history as before.
+    """
+    args = _budget_args(state['messages'])
+    tool_call = {"name": "budget_agent", "args": args, "id": f"budget_{len(state['messages'])}"}
+    
+    print(f"\n{'─'*60}")
+    print("🔧 EXECUTING: BUDGET_AGENT (costs taken from agent results)")
+    print(f"      Args: {args}")
+    print(f"{'─'*60}")
+    
+    result = _invoke_agent("budget_agent", _agent_args(args))
+    print("✅ budget_agent completed")
+    print(f"{'─'*60}\n")
+    
+    return {"messages": [
+        AIMessage(content="", tool_calls=[tool_call]),
+        ToolMessage(content=result, tool_call_id=tool_call['id'], name="budget_agent"),
+    ]}
+
+
+# Sections of the assembled plan, in display order
+_SUMMARY_SECTIONS = ["accommodation_agent", "itinerary_agent", "budget_agent"]
+
+
+def summary_node(state: TravelState):
+    """
+    Assemble the final plan from the agent results without an LLM call.
+    Once the budget is in there is nothing left to decide, so the
+    supervisor's last hop would only concatenate these sections.
+    """
+    results = [
+        message
+        for message in _current_turn(state['messages'])
+        if isinstance(message, ToolMessage)
+    ]
+    
+    print("\n✅ All agents finished, assembling final travel plan")
+    
+    # Every result of the turn (two hotel searches give two hotel sections),
+    # grouped in display order and otherwise in the order they came back
+    def section_order(message):
+        if message.name in _SUMMARY_SECTIONS:
+            return _SUMMARY_SECTIONS.index(message.name)
+        return len(_SUMMARY_SECTIONS)
+    
+    sections = ["✈️ YOUR TRAVEL PLAN"]
+    sections += [message.content for message in sorted(results, key=section_order)]
+    
+    return {"messages": [AIMessage(content="\n\n".join(sections))]}
+
+
 # ============================================
 # ROUTING
 # ============================================
@@ -123,6 +358,55 @@ def should_continue(state: TravelState) -> str:
     return END
 
 
+def after_tools(state: TravelState) -> str:
+    """
+    Go straight to the budget step when all costs are available,
+    otherwise back to the supervisor.
+    """
+    if _budget_args(state['messages']) is not None:
+        return "budget"
+    return "supervisor"
+
+
+def after_budget(state: TravelState) -> str:
+    """
+    Assemble the plan directly unless the LLM supervisor is enabled
+    (USE_LLM_SUPERVISOR=true) to write it.
+    """
+    if USE_LLM_SUPERVISOR:
+        return "supervisor"
+    return "summary"
+
+
+# ============================================
+# CHECKPOINTER
+# ============================================
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver that keeps at most max_threads conversations.
+    
+    One compiled graph is shared by every app session, so a plain MemorySaver
+    would hold every thread for the lifetime of the process. Saving a thread
+    marks it most recent; past the limit the oldest threads are dropped.
+    """
+    max_threads: int = CHECKPOINT_THREADS
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    
+    def put(self, config, checkpoint) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self.storage.pop(thread_id, None)
+            self.storage[thread_id] = checkpoint
+            while len(self.storage) > self.max_threads:
+                self.storage.pop(next(iter(self.storage)))
+    
+    def forget(self, thread_id: str) -> None:
+        """Drop a conversation that will not be continued (e.g. after Clear Chat)."""
+        with self._lock:
+            self.storage.pop(thread_id, None)
+
+
 # ============================================
 # BUILD GRAPH
 # ============================================
@@ -135,6 +419,16 @@ def build_travel_agent():
     - Supervisor: Reasons about user request and calls specialist agents (Reasoning)
     - Tool Node: Executes specialist agent tools (Acting)
     - Loop: Supervisor → Tools → Supervisor until no more tool calls (Observation & Re-reasoning)
+    - Budget: once hotel and itinerary costs are in, budget_agent runs
+      directly instead of waiting for the supervisor to route it
+    - Summary: the final plan is assembled from the agent results
+      (set USE_LLM_SUPERVISOR=true to let the supervisor write it)
+    
+    State is checkpointed per thread_id (BoundedMemorySaver), so each turn only
+    sends the new user message and earlier agent results stay available.
+    Checkpoints are written at the end of a run: a run that fails midway
+    leaves the thread as it was before that turn. At most
+    CHECKPOINT_THREADS conversations are kept in memory.
     
     This is a clean ReAct loop:
     1. Supervisor reasons and decides which agents to call
@@ -148,6 +442,8 @@ def build_travel_agent():
     # Add nodes
     workflow.add_node("supervisor", supervisor_node)
     workflow.add_node("tools", tool_node)
+    workflow.add_node("budget", budget_node)
+    workflow.add_node("summary", summary_node)
     
     # Set entry point
     workflow.set_entry_point("supervisor")
@@ -162,14 +458,64 @@ def build_travel_agent():
         }
     )
     
-    # After tools execute, go back to supervisor for next reasoning step
-    workflow.add_edge("tools", "supervisor")
+    # After tools execute, run the budget step if costs are known,
+    # otherwise go back to supervisor for next reasoning step
+    workflow.add_conditional_edges(
+        "tools",
+        after_tools,
+        {
+            "budget": "budget",
+            "supervisor": "supervisor"
+        }
+    )
+    workflow.add_conditional_edges(
+        "budget",
+        after_budget,
+        {
+            "summary": "summary",
+            "supervisor": "supervisor"
+        }
+    )
+    workflow.add_edge("summary", END)
+    
+    return workflow.compile(checkpointer=BoundedMemorySaver())
+
+
+# ============================================
+# BATCH PLANNING
+# ============================================
+
+@lru_cache(maxsize=1)
+def _batch_agent():
+    """Compile the graph for run_batch once and reuse it across batches."""
+    return build_travel_agent()
+
+
+def run_batch(user_requests: List[str], max_workers: int = 4, agent=None) -> List[str]:
+    """
+    Plan several independent trips (evaluations, precomputed itineraries).
+    
+    All requests share one compiled graph (built once, or the given agent),
+    LLM clients and agent result cache, and run concurrently, each in its own
+    checkpointer thread. Returns the final plans in the same order as the requests.
+    """
+    agent = agent or _batch_agent()
+    # Fresh thread ids per batch, so a request never continues an earlier batch's conversation
+    batch_id = uuid.uuid4().hex[:8]
+    
+    def run(indexed_request):
+        index, user_request = indexed_request
+        config = {"configurable": {"thread_id": f"batch-{batch_id}-{index}"}}
+        response = agent.invoke({"messages": [HumanMessage(content=user_request)]}, config)
+        return response["messages"][-1].content
     
-    return workflow.compile()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, enumerate(user_requests)))
 
 
 if __name__ == "__main__":
     print("🚀 Building multi-agent travel planner...")
+    enable_llm_cache()
     agent = build_travel_agent()
     print("✅ Multi-agent system ready!")
 
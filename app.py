@@ -3,9 +3,12 @@ Multi-Agent Travel Planner - Simplified Streamlit Interface
 Basic chat interface using core Streamlit components only.
 """
 
+import uuid
 import streamlit as st
 from agents import build_travel_agent
-from langchain_core.messages import AIMessage, HumanMessage
+from constants import enable_llm_cache
+from langchain_core.messages import HumanMessage, ToolMessage
+from langgraph.graph import END
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,12 +18,11 @@ load_dotenv()
 # HELPER FUNCTIONS
 # ============================================
 
-def convert_dict_to_lc_message(msg):
-    """Convert session state message dict to LangChain message object."""
-    if msg["role"] == "user":
-        return HumanMessage(content=msg["content"])
-    elif msg["role"] == "assistant":
-        return AIMessage(content=msg["content"])
+@st.cache_resource
+def get_travel_agent():
+    """Compile the agent graph once per process and share it across sessions and reruns."""
+    enable_llm_cache()
+    return build_travel_agent()
 
 
 # ============================================
@@ -42,10 +44,14 @@ st.set_page_config(
 if 'messages' not in st.session_state:
     st.session_state.messages = []
 
+# Conversation thread for the agent's checkpointer
+if 'thread_id' not in st.session_state:
+    st.session_state.thread_id = str(uuid.uuid4())
+
 # Initialize agent
 if 'agent' not in st.session_state:
     try:
-        st.session_state.agent = build_travel_agent()
+        st.session_state.agent = get_travel_agent()
     except Exception as e:
         st.error(f"Failed to initialize travel agent: {str(e)}")
         st.stop()
@@ -79,13 +85,21 @@ if prompt:
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
             try:
-                # Convert to LangChain format
-                lc_messages = [convert_dict_to_lc_message(msg) for msg in st.session_state.messages]
+                # Only the new message is sent: earlier turns live in the checkpointer
+                config = {"configurable": {"thread_id": st.session_state.thread_id}}
                 
-                # Invoke agent with simplified state (only messages field needed)
-                response = st.session_state.agent.invoke({
-                    "messages": lc_messages
-                })
+                # Stream agent steps with simplified state (only messages field needed),
+                # showing each specialist's result as soon as it finishes
+                response = None
+                for step in st.session_state.agent.stream({"messages": [HumanMessage(content=prompt)]}, config):
+                    if END in step:
+                        response = step[END]
+                        continue
+                    for update in step.values():
+                        for message in update["messages"]:
+                            if isinstance(message, ToolMessage):
+                                with st.expander(f"✅ {message.name} finished"):
+                                    st.write(message.content)
                 
                 # Get final response
                 assistant_msg = response["messages"][-1].content
@@ -98,11 +112,9 @@ if prompt:
         # Display response after spinner
         st.write(assistant_msg)
     
-    # Add assistant message
+    # Add assistant message (already on screen, so no rerun is needed;
+    # the history loop above renders it from the next interaction on)
     st.session_state.messages.append({"role": "assistant", "content": assistant_msg})
-    
-    # Rerun to update display
-    st.rerun()
 
 
 # ============================================
@@ -114,6 +126,9 @@ with st.sidebar:
     
     if st.button("Clear Chat"):
         st.session_state.messages = []
+        # Free the old conversation in the shared checkpointer before starting a new one
+        get_travel_agent().checkpointer.forget(st.session_state.thread_id)
+        st.session_state.thread_id = str(uuid.uuid4())
         st.rerun()
     
     st.divider()
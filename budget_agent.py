@@ -1,17 +1,54 @@
 """
-Budget Agent - LLM-Powered Specialist with Multiple Tools
+Budget Agent - Deterministic Specialist with Multiple Tools
 
-This agent has its own LLM and can use multiple internal tools to:
+The budget is pure arithmetic, so this agent runs its internal tools
+directly (no LLM) to:
 - Calculate detailed budgets
 - Estimate daily costs
 - Provide budget optimization tips
 - Compare spending scenarios
 """
 
+import re
 from langchain.tools import tool
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, ToolMessage
-from constants import get_llm
+
+
+# ============================================
+# BUDGET RULES (Fixed, built once at import)
+# ============================================
+
+# Cost per day by budget level
+_DAILY_RATES = {
+    "budget": {"food": 40, "transport": 20},
+    "moderate": {"food": 60, "transport": 30},
+    "luxury": {"food": 100, "transport": 50}
+}
+
+# Tips when the trip goes over the user's budget
+_OVER_BUDGET_TIPS = (
+    "Consider budget airlines to save on flights",
+    "Look for hostels or budget hotels",
+    "Choose free attractions",
+    "Reduce trip duration by 1-2 days"
+)
+
+
+# ============================================
+# HELPER FUNCTIONS
+# ============================================
+
+# First number in a string, allowing thousands separators and decimals
+# (never negative: a stray '-' in '-3 days' or '- $200' is not a sign)
+_AMOUNT_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _parse_amount(value):
+    """
+    Parse amounts the way the LLM writes them ('$1,200', '1200.50', '3 days').
+    Returns None if there is no number, so callers can tell a missing cost from $0.
+    """
+    match = _AMOUNT_RE.search(str(value))
+    return int(float(match.group().replace(',', ''))) if match else None
 
 
 # ============================================
@@ -19,23 +56,34 @@ from constants import get_llm
 # ============================================
 
 @tool
-def calculate_core_budget(flights_cost: str, hotel_cost: str, activities_cost: str):
+def calculate_core_budget(hotel_cost: str, activities_cost: str, flights_cost: str = ""):
     """Calculate budget from major expenses only.
     
     Use this for basic budget calculation.
     
     Args:
-        flights_cost: Flight cost
         hotel_cost: Hotel cost
         activities_cost: Activities cost
+        flights_cost: Flight cost, empty if flights are not included (default: '')
         
     Returns:
-        dict: Core expenses breakdown
+        dict: Core expenses breakdown (flights is None when not included)
     """
-    flights = int(flights_cost.strip().replace('$', ''))
-    hotel = int(hotel_cost.strip().replace('$', ''))
-    activities = int(activities_cost.strip().replace('$', ''))
-    core_total = flights + hotel + activities
+    hotel = _parse_amount(hotel_cost)
+    activities = _parse_amount(activities_cost)
+    costs = [("hotel", hotel_cost, hotel), ("activities", activities_cost, activities)]
+    
+    # No flight search ran: leave flights out rather than costing them at $0
+    flights = None
+    if str(flights_cost).strip():
+        flights = _parse_amount(flights_cost)
+        costs.insert(0, ("flights", flights_cost, flights))
+    
+    missing = [f"{name} cost '{value}'" for name, value, amount in costs if amount is None]
+    if missing:
+        return {"error": f"No amount found in the {', '.join(missing)}"}
+    
+    core_total = (flights or 0) + hotel + activities
     
     return {
         "flights": flights,
@@ -58,16 +106,12 @@ def estimate_daily_costs(num_days: str, budget_level: str = "moderate"):
     Returns:
         dict: Daily cost estimates
     """
-    num_days = int(num_days)
+    days = _parse_amount(num_days)
+    if days is None:
+        return {"error": f"No number of days found in '{num_days}'"}
+    num_days = days
     
-    # Cost per day by budget level
-    daily_rates = {
-        "budget": {"food": 40, "transport": 20},
-        "moderate": {"food": 60, "transport": 30},
-        "luxury": {"food": 100, "transport": 50}
-    }
-    
-    rates = daily_rates.get(budget_level.lower(), daily_rates["moderate"])
+    rates = _DAILY_RATES.get(budget_level.lower(), _DAILY_RATES["moderate"])
     
     food_total = rates["food"] * num_days
     transport_total = rates["transport"] * num_days
@@ -96,7 +140,9 @@ def calculate_miscellaneous(major_expenses_total: str):
     Returns:
         dict: Miscellaneous cost calculation
     """
-    total = int(major_expenses_total.replace('$', ''))
+    total = _parse_amount(major_expenses_total)
+    if total is None:
+        return {"error": f"No amount found in '{major_expenses_total}'"}
     misc = int(total * 0.1)
     
     return {
@@ -119,22 +165,17 @@ def optimize_budget(total_cost: str, user_budget: str):
     Returns:
         dict: Budget comparison and tips
     """
-    total = int(total_cost.replace('$', ''))
-    budget = int(user_budget.replace('$', ''))
+    total = _parse_amount(total_cost)
+    budget = _parse_amount(user_budget)
+    if total is None or budget is None:
+        return {"error": f"No amount found in total '{total_cost}' or budget '{user_budget}'"}
     difference = budget - total
     percentage = (total / budget * 100) if budget > 0 else 0
     
     status = "under" if difference >= 0 else "over"
     
-    tips = []
     if status == "over":
-        overage = abs(difference)
-        tips = [
-            f"Consider budget airlines to save on flights",
-            f"Look for hostels or budget hotels",
-            f"Choose free attractions",
-            f"Reduce trip duration by 1-2 days"
-        ]
+        tips = list(_OVER_BUDGET_TIPS)
     else:
         tips = [f"Great! You have ${difference} buffer in your budget"]
     
@@ -153,133 +194,77 @@ def optimize_budget(total_cost: str, user_budget: str):
 # ============================================
 
 @tool
-def budget_agent(flights_cost: str, hotel_cost: str, num_days: str, activities_cost: str = "0", user_budget: str = "0"):
-    """AI-powered budget calculator with intelligent analysis.
+def budget_agent(hotel_cost: str, num_days: str, activities_cost: str = "0", flights_cost: str = "", user_budget: str = "0", budget_level: str = "moderate"):
+    """Budget calculator with a complete cost breakdown.
     
-    Calculates comprehensive trip budget with personalized insights.
+    Calculates comprehensive trip budget, compared against the user's budget if given.
     
     Use this agent when you need to calculate the total cost of the trip.
     
     Args:
-        flights_cost: Total flight cost
         hotel_cost: Total hotel/accommodation cost
         num_days: Number of days for the trip
         activities_cost: Total cost of activities/attractions (default: '0')
+        flights_cost: Total flight cost, empty if no flights were searched (default: '')
         user_budget: User's budget limit if specified (default: '0')
+        budget_level: Daily spending level - 'budget', 'moderate' or 'luxury' (default: 'moderate')
         
     Returns:
-        str: AI-generated budget analysis with recommendations
+        str: Formatted budget breakdown with recommendations
     """
-    # Create sub-agent with its own LLM
-    llm = get_llm()
+    print("  🧮 Budget Agent calculating breakdown with its tools (no LLM call)")
     
-    # Define internal tools
-    budget_tools = [
-        calculate_core_budget,
-        estimate_daily_costs,
-        calculate_miscellaneous,
-        optimize_budget
-    ]
+    # Same steps the tools were designed for: core -> daily -> 10% buffer -> compare
+    core = calculate_core_budget.invoke({
+        "flights_cost": flights_cost,
+        "hotel_cost": hotel_cost,
+        "activities_cost": activities_cost
+    })
+    daily = estimate_daily_costs.invoke({"num_days": num_days, "budget_level": budget_level})
     
-    # Agent's system prompt
-    agent_prompt = ChatPromptTemplate.from_messages([
-        ("system", f"""You are an expert Budget Planning Specialist.
-
-Your internal tools:
-- calculate_core_budget: Calculate major expenses (flights, hotel, activities)
-- estimate_daily_costs: Estimate food and transport costs
-- calculate_miscellaneous: Add 10% buffer for unexpected costs
-- optimize_budget: Compare vs user budget and provide tips
-
-Process:
-1. Use calculate_core_budget with the major expenses
-2. Use estimate_daily_costs for {num_days} days (use 'moderate' level unless specified)
-3. Add everything up
-4. Use calculate_miscellaneous on the subtotal
-5. If user_budget > 0, use optimize_budget to compare
-6. Format a professional budget breakdown
-
-Format your output as:
-💰 COMPLETE BUDGET BREAKDOWN
-Please ALWAYS output your numbers as integers
+    # A cost that isn't a number must not show up as a $0 line item
+    errors = [result["error"] for result in (core, daily) if "error" in result]
+    if errors:
+        print(f"  ⚠️ Budget Agent could not read its inputs: {'; '.join(errors)}")
+        return "💰 BUDGET NOT CALCULATED\n\n" + "\n".join(f"- {error}" for error in errors)
+    
+    subtotal = core["core_total"] + daily["daily_expenses_total"]
+    misc = calculate_miscellaneous.invoke({"major_expenses_total": str(subtotal)})
+    total = subtotal + misc["miscellaneous"]
+    
+    flights = "not included" if core["flights"] is None else f"${core['flights']:,}"
+    breakdown = f"""💰 COMPLETE BUDGET BREAKDOWN
 
 **Major Expenses:**
-- Flights: $X
-- Accommodation: $Y
-- Activities: $Z
+- Flights: {flights}
+- Accommodation: ${core["hotel"]:,}
+- Activities: ${core["activities"]:,}
 
 **Daily Expenses:**
-- Food & Dining: $X ($Y/day)
-- Local Transport: $X ($Y/day)
-- Miscellaneous: $X (10% buffer)
+- Food & Dining: ${daily["food_total"]:,} (${daily["food_per_day"]}/day)
+- Local Transport: ${daily["transport_total"]:,} (${daily["transport_per_day"]}/day)
+- Miscellaneous: ${misc["miscellaneous"]:,} (10% buffer)
 
 ━━━━━━━━━━━━━━━━━━━━
-💵 TOTAL TRIP COST: $X,XXX
-━━━━━━━━━━━━━━━━━━━━
-
-[Include budget analysis if user_budget provided]"""),
-        ("placeholder", "{messages}")
-    ])
-    
-    # Bind tools
-    agent = agent_prompt | llm.bind_tools(budget_tools)
+💵 TOTAL TRIP COST: ${total:,}
+━━━━━━━━━━━━━━━━━━━━"""
     
-    # Create task
-    task = HumanMessage(
-        content=f"""Calculate complete trip budget:
-- Flights: {flights_cost}
-- Hotel: {hotel_cost}
-- Activities: {activities_cost}
-- Duration: {num_days} days
-{f"- User Budget: {user_budget}" if int(user_budget) > 0 else ""}
+    # No budget given ('0', 'none', 'N/A'): skip the comparison
+    if _parse_amount(user_budget):
+        analysis = optimize_budget.invoke({"total_cost": str(total), "user_budget": user_budget})
+        difference = abs(analysis["difference"])
+        if analysis["status"] == "under":
+            status = f"✅ Under budget by ${difference:,} ({analysis['percentage_used']}% used)"
+        else:
+            status = f"⚠️ Over budget by ${difference:,} ({analysis['percentage_used']}% used)"
+        tips = "\n".join(f"- {tip}" for tip in analysis["tips"])
+        breakdown += f"""
 
-Use your tools to create a detailed budget breakdown."""
-    )
-    
-    # Execute ReAct loop
-    messages = [task]
-    max_iterations = 6
-    
-    print(f"  💭 Budget Agent starting ReAct loop (max {max_iterations} iterations)...")
-    
-    for iteration in range(max_iterations):
-        print(f"\n  🔄 Iteration {iteration + 1}: Reasoning...")
-        
-        result = agent.invoke({"messages": messages})
-        messages.append(result)
-        
-        if not hasattr(result, 'tool_calls') or not result.tool_calls:
-            print(f"  ✅ Budget Agent finished reasoning - no more tools needed")
-            break
-        
-        print(f"  📞 Budget Agent decided to call {len(result.tool_calls)} internal tool(s):")
-        for tool_call in result.tool_calls:
-            tool_name = tool_call['name']
-            tool_args = tool_call['args']
-            
-            print(f"     🔨 Calling: {tool_name}")
-            print(f"        Args: {tool_args}")
-            
-            tool_map = {
-                "calculate_core_budget": calculate_core_budget,
-                "estimate_daily_costs": estimate_daily_costs,
-                "calculate_miscellaneous": calculate_miscellaneous,
-                "optimize_budget": optimize_budget
-            }
-            
-            if tool_name in tool_map:
-                tool_result = tool_map[tool_name].invoke(tool_args)
-                print(f"     ✓ {tool_name} returned results")
-                
-                messages.append(
-                    ToolMessage(
-                        content=str(tool_result),
-                        tool_call_id=tool_call['id'],
-                        name=tool_name
-                    )
-                )
-    
-    final_response = messages[-1].content if messages else "Budget calculation failed"
-    
-    return final_response
+**Budget Analysis:**
+- Your budget: ${analysis["user_budget"]:,}
+- {status}
 
+**Tips:**
+{tips}"""
+    
+    return breakdown
@@ -3,9 +3,16 @@ Constants and shared configuration for the travel planner.
 """
 
 import os
+import sys
 import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
+from langchain_core.caches import InMemoryCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
 from langchain_groq import ChatGroq
 
 load_dotenv()
@@ -15,14 +22,69 @@ load_dotenv()
 # ============================================
 
 LLM_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+# Smaller, faster model for routing and tool-driven agents (supervisor, hotels)
+LLM_MODEL_FAST = "llama-3.1-8b-instant"
 LLM_TEMPERATURE = 0
 LLM_API_KEY = os.getenv("GROQ_API_KEY")
 
+# LLM responses kept for identical prompts (0 disables the cache)
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
 
-def get_llm():
-    """Get configured LLM instance."""
+
+class BoundedLLMCache(InMemoryCache):
+    """
+    InMemoryCache holding at most maxsize responses, least recently used evicted.
+    The cache is process-global, so unbounded it would keep every prompt from
+    every app session for the lifetime of the process.
+    """
+    
+    def __init__(self, maxsize: int = LLM_CACHE_SIZE) -> None:
+        super().__init__()
+        self._cache = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+    
+    def lookup(self, prompt: str, llm_string: str):
+        with self._lock:
+            key = (prompt, llm_string)
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key]
+    
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        with self._lock:
+            self._cache[(prompt, llm_string)] = return_val
+            self._cache.move_to_end((prompt, llm_string))
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+    
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._cache = OrderedDict()
+
+
+def enable_llm_cache() -> bool:
+    """
+    Reuse responses for identical prompts (same messages, model and bound tools).
+    Call once at startup; only installed when sampling is deterministic
+    (temperature 0) and LLM_CACHE_SIZE is not 0. Returns whether the cache is on.
+    """
+    if LLM_TEMPERATURE != 0 or LLM_CACHE_SIZE <= 0:
+        return False
+    if not isinstance(get_llm_cache(), BoundedLLMCache):
+        set_llm_cache(BoundedLLMCache())
+    return True
+
+# Let the supervisor LLM write the final plan instead of assembling the agent outputs directly
+USE_LLM_SUPERVISOR = os.getenv("USE_LLM_SUPERVISOR", "false").lower() == "true"
+
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = LLM_MODEL):
+    """Get configured LLM instance (created once per model, so its HTTP client is reused)."""
     return ChatGroq(
-        model=LLM_MODEL,
+        model=model,
         temperature=LLM_TEMPERATURE,
         groq_api_key=LLM_API_KEY
     )
@@ -37,9 +99,110 @@ DATA_DIR = Path(__file__).parent / "data"
 with open(DATA_DIR / "flights.json", 'r', encoding='utf-8') as f:
     FLIGHTS_DATA = json.load(f)
 
+
+@dataclass(frozen=True, slots=True)
+class Hotel:
+    """Immutable accommodation record (slots keep each one small)."""
+    id: str
+    name: str
+    city: str
+    type: str
+    price_per_night: int
+    rating: float
+    amenities: tuple
+    location: str
+    description: str
+
+
 with open(DATA_DIR / "accommodations.json", 'r', encoding='utf-8') as f:
-    ACCOMMODATIONS_DATA = json.load(f)
+    ACCOMMODATIONS_DATA = [
+        Hotel(**{**h, 'amenities': tuple(h['amenities'])})
+        for h in json.load(f)
+    ]
 
 with open(DATA_DIR / "attractions.json", 'r', encoding='utf-8') as f:
     ATTRACTIONS_DATA = json.load(f)
 
+
+# ============================================
+# DATA INDEXES (built once at import)
+# ============================================
+
+# Accommodations keyed by lowercased city
+ACCOMMODATIONS_BY_CITY = {}
+# Accommodations keyed by (lowercased city, lowercased type), highest rated first
+ACCOMMODATIONS_BY_CITY_TYPE = {}
+
+for hotel in ACCOMMODATIONS_DATA:
+    city_key = sys.intern(hotel.city.lower())
+    type_key = sys.intern(hotel.type.lower())
+    ACCOMMODATIONS_BY_CITY.setdefault(city_key, []).append(hotel)
+    ACCOMMODATIONS_BY_CITY_TYPE.setdefault((city_key, type_key), []).append(hotel)
+
+for hotels in ACCOMMODATIONS_BY_CITY_TYPE.values():
+    hotels.sort(key=lambda x: x.rating, reverse=True)
+
+# Per-city accommodations presorted for the rating/price search tools
+ACCOMMODATIONS_BY_RATING = {
+    city: sorted(hotels, key=lambda x: x.rating, reverse=True)
+    for city, hotels in ACCOMMODATIONS_BY_CITY.items()
+}
+ACCOMMODATIONS_BY_PRICE = {
+    city: sorted(hotels, key=lambda x: x.price_per_night)
+    for city, hotels in ACCOMMODATIONS_BY_CITY.items()
+}
+
+# Per-city accommodations ranked for the 'balanced' preference. Rating and price
+# are both scaled to 0-1 within the city, so neither dominates:
+# score = scaled rating - scaled price (ties go to the cheaper hotel)
+ACCOMMODATIONS_BY_VALUE = {}
+for city, hotels in ACCOMMODATIONS_BY_CITY.items():
+    min_rating = min(h.rating for h in hotels)
+    rating_range = (max(h.rating for h in hotels) - min_rating) or 1
+    min_price = min(h.price_per_night for h in hotels)
+    price_range = (max(h.price_per_night for h in hotels) - min_price) or 1
+    ACCOMMODATIONS_BY_VALUE[city] = sorted(
+        hotels,
+        key=lambda x: (
+            (x.rating - min_rating) / rating_range - (x.price_per_night - min_price) / price_range,
+            -x.price_per_night
+        ),
+        reverse=True
+    )
+
+# Flights keyed by (lowercased origin, lowercased destination)
+FLIGHTS_BY_ROUTE = {}
+# Destinations reachable from each lowercased origin (for "no flights" fallbacks)
+FLIGHT_DESTINATIONS_BY_ORIGIN = {}
+
+for flight in FLIGHTS_DATA:
+    origin_key = sys.intern(flight['origin'].lower())
+    destination_key = sys.intern(flight['destination'].lower())
+    FLIGHTS_BY_ROUTE.setdefault((origin_key, destination_key), []).append(flight)
+    FLIGHT_DESTINATIONS_BY_ORIGIN.setdefault(origin_key, set()).add(flight['destination'])
+
+# Cheapest first, so "top N flights" on a route is just a slice
+for flights in FLIGHTS_BY_ROUTE.values():
+    flights.sort(key=lambda x: x['price'])
+
+# Attractions keyed by lowercased city
+ATTRACTIONS_BY_CITY = {}
+# Attractions keyed by (lowercased city, lowercased category)
+ATTRACTIONS_BY_CITY_CATEGORY = {}
+
+for attraction in ATTRACTIONS_DATA:
+    city_key = sys.intern(attraction['city'].lower())
+    category_key = sys.intern(attraction['category'].lower())
+    ATTRACTIONS_BY_CITY.setdefault(city_key, []).append(attraction)
+    ATTRACTIONS_BY_CITY_CATEGORY.setdefault((city_key, category_key), []).append(attraction)
+
+# Per-city attractions presorted by duration (longest first) for the top-rated search
+ATTRACTIONS_BY_DURATION = {
+    city: sorted(attractions, key=lambda x: x.get('duration_hours', 0), reverse=True)
+    for city, attractions in ATTRACTIONS_BY_CITY.items()
+}
+# Per-city free or budget (<= $20) attractions
+ATTRACTIONS_FREE_BY_CITY = {
+    city: [a for a in attractions if a['cost'] <= 20]
+    for city, attractions in ATTRACTIONS_BY_CITY.items()
+}
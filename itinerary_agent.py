@@ -8,10 +8,51 @@ This agent has its own LLM and can use multiple internal tools to:
 - Create intelligent day-by-day plans
 """
 
+from functools import lru_cache
 from langchain.tools import tool
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, ToolMessage
-from constants import get_llm, ATTRACTIONS_DATA
+from langchain_core.messages import HumanMessage
+from agent_loop import final_answer, run_tool_calls
+from constants import (
+    get_llm,
+    ATTRACTIONS_DATA,
+    ATTRACTIONS_BY_CITY,
+    ATTRACTIONS_BY_CITY_CATEGORY,
+    ATTRACTIONS_BY_DURATION,
+    ATTRACTIONS_FREE_BY_CITY,
+)
+
+
+# ============================================
+# HELPER FUNCTIONS
+# ============================================
+
+# Emoji shown next to each activity in the itinerary, by category
+_CATEGORY_EMOJI = {
+    "Culture": "🏛️",
+    "Landmark": "🗼",
+    "Food": "🍜",
+    "Nature": "🌿",
+    "Shopping": "🛍️",
+    "Entertainment": "🎭",
+    "Adventure": "🧗",
+    "Wellness": "🧘",
+}
+
+# Compact table row for every attraction, built once. Columns:
+# emoji|id|name|category|duration|cost|description
+_ATTRACTION_ROWS = {
+    a['id']: (
+        f"{_CATEGORY_EMOJI.get(a['category'], '📍')}|{a['id']}|{a['name']}|{a['category']}|"
+        f"{a['duration_hours']}h|{'Free' if a['cost'] == 0 else '$' + str(a['cost'])}|{a['description']}"
+    )
+    for a in ATTRACTIONS_DATA
+}
+
+
+def _attraction_table(attractions) -> str:
+    """One preformatted row per attraction, far fewer tokens than a list of dicts."""
+    return "\n".join(_ATTRACTION_ROWS[a['id']] for a in attractions)
 
 
 # ============================================
@@ -28,17 +69,14 @@ def search_all_attractions(destination: str):
         destination: City name
         
     Returns:
-        dict: All attractions in the city
+        dict: Table of all attractions in the city
     """
-    attractions = [
-        a for a in ATTRACTIONS_DATA
-        if a['city'].lower() == destination.lower()
-    ]
+    attractions = ATTRACTIONS_BY_CITY.get(destination.lower(), [])
     
     if not attractions:
-        return {"attractions": [], "error": f"No attractions found for {destination}"}
+        return {"table": "", "error": f"No attractions found for {destination}"}
     
-    return {"attractions": attractions, "count": len(attractions)}
+    return {"table": _attraction_table(attractions), "count": len(attractions)}
 
 
 @tool
@@ -52,15 +90,11 @@ def filter_by_category(destination: str, category: str):
         category: Category (Culture, Landmark, Food, Nature, Shopping, Entertainment, Adventure, Wellness)
         
     Returns:
-        dict: Attractions in the specified category
+        dict: Table of attractions in the specified category
     """
-    attractions = [
-        a for a in ATTRACTIONS_DATA
-        if a['city'].lower() == destination.lower() and
-           a['category'].lower() == category.lower()
-    ]
+    attractions = ATTRACTIONS_BY_CITY_CATEGORY.get((destination.lower(), category.lower()), [])
     
-    return {"attractions": attractions, "category": category, "count": len(attractions)}
+    return {"table": _attraction_table(attractions), "category": category, "count": len(attractions)}
 
 
 @tool
@@ -74,19 +108,14 @@ def search_top_rated(destination: str, min_rating: str = "4.0"):
         min_rating: Minimum rating (default: "4.0")
         
     Returns:
-        dict: Highly-rated attractions
+        dict: Table of highly-rated attractions
     """
     min_rating = float(min_rating)
     
-    attractions = [
-        a for a in ATTRACTIONS_DATA
-        if a['city'].lower() == destination.lower()
-    ]
-    
-    # Filter and sort by rating (if rating field exists)
-    top_attractions = sorted(attractions, key=lambda x: x.get('duration_hours', 0), reverse=True)[:10]
+    # Presorted per city, longest first (attractions have no rating field)
+    top_attractions = ATTRACTIONS_BY_DURATION.get(destination.lower(), [])[:10]
     
-    return {"attractions": top_attractions, "min_rating": min_rating}
+    return {"table": _attraction_table(top_attractions), "min_rating": min_rating}
 
 
 @tool
@@ -99,51 +128,35 @@ def filter_free_attractions(destination: str):
         destination: City name
         
     Returns:
-        dict: Free or low-cost attractions
+        dict: Table of free or low-cost attractions
     """
-    attractions = [
-        a for a in ATTRACTIONS_DATA
-        if a['city'].lower() == destination.lower() and
-           a['cost'] <= 20  # Free or under $20
-    ]
+    attractions = ATTRACTIONS_FREE_BY_CITY.get(destination.lower(), [])  # Free or under $20
     
-    return {"attractions": attractions, "max_cost": 20}
+    return {"table": _attraction_table(attractions), "max_cost": 20}
 
 
 # ============================================
-# ITINERARY AGENT (Exposed to supervisor as tool)
+# AGENT PIPELINE (Built once, reused across calls)
 # ============================================
 
-@tool
-def itinerary_agent(destination: str, num_days: str, interests: str = "sightseeing, food, culture"):
-    """AI-powered itinerary planner with intelligent activity selection.
-    
-    Creates personalized day-by-day plans based on user interests.
-    
-    Use this agent when you need to plan a daily schedule for the trip.
-    
-    Args:
-        destination: City to plan itinerary for (e.g., 'Paris', 'Tokyo')
-        num_days: Number of days for the trip
-        interests: User's interests (e.g., 'food, culture, adventure')
-        
-    Returns:
-        str: AI-generated day-by-day itinerary
-    """
-    # Create sub-agent with its own LLM
-    llm = get_llm()
-    
-    # Define internal tools
-    itinerary_tools = [
-        search_all_attractions,
-        filter_by_category,
-        search_top_rated,
-        filter_free_attractions
-    ]
-    
-    # Agent's system prompt
-    agent_prompt = ChatPromptTemplate.from_messages([
-        ("system", f"""You are an expert Itinerary Planning Specialist.
+_ITINERARY_TOOLS = [
+    search_all_attractions,
+    filter_by_category,
+    search_top_rated,
+    filter_free_attractions
+]
+
+# Map tool names to functions
+_TOOL_MAP = {
+    "search_all_attractions": search_all_attractions,
+    "filter_by_category": filter_by_category,
+    "search_top_rated": search_top_rated,
+    "filter_free_attractions": filter_free_attractions
+}
+
+# Agent's system prompt - static; days and interests come in the task message
+_AGENT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert Itinerary Planning Specialist.
 
 Your internal tools:
 - search_all_attractions: Get all available attractions
@@ -151,11 +164,11 @@ Your internal tools:
 - search_top_rated: Find top-rated experiences
 - filter_free_attractions: Find budget-friendly options
 
-User interests: {interests}
-Trip duration: {num_days} days
+Tool results come back as a "table" with one attraction per line:
+emoji|id|name|category|duration|cost|description
 
 Your strategy:
-1. Identify categories that match user interests
+1. Identify categories that match the user interests given in the task
 2. Use appropriate filters to get relevant attractions
 3. Select 2-3 activities per day (don't overpack!)
 4. Balance different types of activities
@@ -163,7 +176,7 @@ Your strategy:
 6. Create a logical day-by-day flow
 
 Format your output as:
-📅 {num_days}-DAY ITINERARY FOR [DESTINATION]
+📅 [N]-DAY ITINERARY FOR [DESTINATION]
 
 Day 1:
   [emoji] Activity Name (Category)
@@ -174,11 +187,38 @@ Day 2:
   ...
 
 Total Activities Cost: $XXX"""),
-        ("placeholder", "{messages}")
-    ])
+    ("placeholder", "{messages}")
+])
+
+
+@lru_cache(maxsize=1)
+def _get_agent():
+    """Bind the itinerary tools to the LLM once and reuse the runnable."""
+    return _AGENT_PROMPT | get_llm().bind_tools(_ITINERARY_TOOLS)
+
+
+# ============================================
+# ITINERARY AGENT (Exposed to supervisor as tool)
+# ============================================
+
+@tool
+def itinerary_agent(destination: str, num_days: str, interests: str = "sightseeing, food, culture"):
+    """AI-powered itinerary planner with intelligent activity selection.
     
-    # Bind tools
-    agent = agent_prompt | llm.bind_tools(itinerary_tools)
+    Creates personalized day-by-day plans based on user interests.
+    
+    Use this agent when you need to plan a daily schedule for the trip.
+    
+    Args:
+        destination: City to plan itinerary for (e.g., 'Paris', 'Tokyo')
+        num_days: Number of days for the trip
+        interests: User's interests (e.g., 'food, culture, adventure')
+        
+    Returns:
+        str: AI-generated day-by-day itinerary
+    """
+    # Sub-agent with its own LLM (built on first use, then shared)
+    agent = _get_agent()
     
     # Create task
     task = HumanMessage(
@@ -191,6 +231,8 @@ Use your tools to find the best activities and create a balanced daily schedule.
     
     # Execute ReAct loop
     messages = [task]
+    # Serialized tool results for this run (see run_tool_calls)
+    call_cache = {}
     max_iterations = 8
     
     print(f"  💭 Itinerary Agent starting ReAct loop (max {max_iterations} iterations)...")
@@ -206,32 +248,11 @@ Use your tools to find the best activities and create a balanced daily schedule.
             break
         
         print(f"  📞 Itinerary Agent decided to call {len(result.tool_calls)} internal tool(s):")
-        for tool_call in result.tool_calls:
-            tool_name = tool_call['name']
-            tool_args = tool_call['args']
-            
-            print(f"     🔨 Calling: {tool_name}")
-            print(f"        Args: {tool_args}")
-            
-            tool_map = {
-                "search_all_attractions": search_all_attractions,
-                "filter_by_category": filter_by_category,
-                "search_top_rated": search_top_rated,
-                "filter_free_attractions": filter_free_attractions
-            }
-            
-            if tool_name in tool_map:
-                tool_result = tool_map[tool_name].invoke(tool_args)
-                print(f"     ✓ {tool_name} returned results")
-                
-                messages.append(
-                    ToolMessage(
-                        content=str(tool_result),
-                        tool_call_id=tool_call['id'],
-                        name=tool_name
-                    )
-                )
-    
-    final_response = messages[-1].content if messages else "No itinerary created"
+        messages += run_tool_calls(result.tool_calls, _TOOL_MAP, call_cache, nudge=iteration < max_iterations - 1)
+    
+    final_response = final_answer(
+        messages,
+        f"No itinerary created for {destination}: planning did not finish within {max_iterations} steps."
+    )
     
     return final_response
@@ -3,8 +3,10 @@ Supervisor Agent - Coordinates all specialist agents via tool calls.
 """
 
 from langchain.prompts import ChatPromptTemplate
-from datetime import datetime
-from constants import get_llm
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+import re
+from constants import get_llm, LLM_MODEL_FAST, ACCOMMODATIONS_BY_CITY, ATTRACTIONS_BY_CITY
 
 # Import specialist agent tools
 # from flight_agent import flight_agent
@@ -13,7 +15,124 @@ from itinerary_agent import itinerary_agent
 from budget_agent import budget_agent
 
 
+# ============================================
+# DIRECT REQUEST PARSING (No LLM)
+# ============================================
+
+# Destinations we have both hotels and attractions for: lowercased -> display name
+_CITIES = {
+    city: hotels[0].city
+    for city, hotels in ACCOMMODATIONS_BY_CITY.items()
+    if city in ATTRACTIONS_BY_CITY
+}
+# Longest names first so e.g. 'New York' wins over any shorter overlap
+_CITY_RE = re.compile(
+    r"\b(" + "|".join(re.escape(c) for c in sorted(_CITIES, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+_DAYS_RE = re.compile(r"\b(\d{1,2})[\s-]*(?:days?|nights?)\b", re.IGNORECASE)
+_GUESTS_RE = re.compile(
+    r"\b(\d{1,2})\s*(?:person|persons|people|guest|guests|adult|adults|traveler|travelers"
+    r"|traveller|travellers|pax)\b",
+    re.IGNORECASE
+)
+# Children change the party size and the activities, so the LLM handles those trips
+_CHILDREN_RE = re.compile(
+    r"\b(?:kid|kids|child|children|infant|infants|baby|babies|toddler|toddlers|teen|teens|teenager|teenagers)\b",
+    re.IGNORECASE
+)
+_PLAN_RE = re.compile(r"\b(?:plan|trip|visit|travel|itinerary|holiday|vacation|getaway)\b", re.IGNORECASE)
+_CHEAP_RE = re.compile(r"\b(?:cheap|cheapest|affordable|budget[- ]friendly|on\s+a\s+budget)\b", re.IGNORECASE)
+_LUXURY_RE = re.compile(r"\b(?:luxury|luxurious|5[- ]star)\b", re.IGNORECASE)
+_INTERESTS = r"(culture|landmarks?|food|nature|shopping|entertainment|adventure|wellness)"
+_INTEREST_RE = re.compile(r"\b" + _INTERESTS + r"\b", re.IGNORECASE)
+# An interest the user wants to avoid ("no shopping", "not into food", "skip the culture")
+_NEGATED_INTEREST_RE = re.compile(
+    r"\b(?:no|not|don'?t|dont|never|without|avoid|skip|hate|except|nothing)\b\W+(?:\w+\W+){0,3}?" + _INTERESTS + r"\b",
+    re.IGNORECASE
+)
+# Anything that pins the travel dates (the fast path always starts 30 days from today)
+_DATE_RE = re.compile(
+    r"\b\d{4}-\d{1,2}-\d{1,2}\b|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b"
+    r"|\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b"
+    # "May" only with a day number, so "it may rain" is not a date
+    r"|\bmay\s+\d{1,2}(?:st|nd|rd|th)?\b|\b\d{1,2}(?:st|nd|rd|th)?\s+(?:of\s+)?may\b"
+    r"|\b(?:mon|tues|wednes|thurs|fri|satur|sun)day\b"
+    r"|\b(?:today|tomorrow|tonight|weekend|next\s+(?:week|month|year)|\d+\s*(?:weeks?|months?))\b",
+    re.IGNORECASE
+)
+
+
+def parse_request(text: str):
+    """
+    Turn a plain trip request ("Plan 4 days in Tokyo, love food") into the
+    specialist tool calls the supervisor would make, without the LLM.
+    
+    Returns a list of (tool name, args), or None when the request isn't a
+    clear single-destination trip with one duration - the LLM handles those,
+    as well as anything these args can't carry: dates, children, several
+    durations or party sizes and interests to avoid ("no shopping").
+    """
+    if not _PLAN_RE.search(text):
+        return None
+    
+    cities = {m.lower() for m in _CITY_RE.findall(text)}
+    day_counts = {int(n) for n in _DAYS_RE.findall(text)}
+    guest_counts = _GUESTS_RE.findall(text)
+    if len(cities) != 1 or len(day_counts) != 1 or min(day_counts) < 1:
+        return None
+    if len(guest_counts) > 1 or _CHILDREN_RE.search(text):
+        return None
+    if _DATE_RE.search(text) or _NEGATED_INTEREST_RE.search(text):
+        return None
+    
+    destination = _CITIES[cities.pop()]
+    num_days = day_counts.pop()
+    
+    # Same defaults as the supervisor prompt: travel 30 days from today
+    check_in = date.today() + timedelta(days=30)
+    check_out = check_in + timedelta(days=num_days)
+    
+    if _CHEAP_RE.search(text):
+        preferences = "cheapest"
+    elif _LUXURY_RE.search(text):
+        preferences = "luxury"
+    else:
+        preferences = "balanced"
+    
+    interests = list(dict.fromkeys(m.lower() for m in _INTEREST_RE.findall(text)))
+    
+    return [
+        ("accommodation_agent", {
+            "destination": destination,
+            "check_in": check_in.isoformat(),
+            "check_out": check_out.isoformat(),
+            "guests": guest_counts[0] if guest_counts else "1",
+            "preferences": preferences,
+        }),
+        ("itinerary_agent", {
+            "destination": destination,
+            "num_days": str(num_days),
+            "interests": ", ".join(interests) if interests else "sightseeing, food, culture",
+        }),
+    ]
+
+
+# ============================================
+# SUPERVISOR AGENT
+# ============================================
+
 def create_supervisor():
+    """
+    Get the supervisor agent, rebuilt only when the date changes
+    (the prompt embeds today's date).
+    """
+    return _build_supervisor(datetime.now().strftime("%Y-%m-%d"))
+
+
+@lru_cache(maxsize=1)
+def _build_supervisor(today: str):
     """
     Create the supervisor agent that coordinates specialist agents.
     
@@ -28,14 +147,14 @@ def create_supervisor():
     - Acting: Calls specialist agent tools with appropriate parameters
     - Observation: Reviews agent outputs and compiles final plan
     """
-    llm = get_llm()
+    llm = get_llm(LLM_MODEL_FAST)
     
     # List of agent tools available to supervisor
     agent_tools = [accommodation_agent, itinerary_agent, budget_agent] #add flight_agent
     
     supervisor_prompt = ChatPromptTemplate.from_messages([
         ("system", f"""You are a Travel Planning Supervisor coordinating specialist agents via tool calls.
-Today's date: {datetime.now().strftime("%Y-%m-%d")}
+Today's date: {today}
 
 **Your Specialist Agent Tools:**
 
@@ -59,7 +178,9 @@ Today's date: {datetime.now().strftime("%Y-%m-%d")}
 
 2. Call accommodation_agent(destination, check_in, check_out, guests)
 3. Call itinerary_agent(destination, num_days, interests)
-4. Extract costs from outputs and call budget_agent(hotel_cost, num_days, activities_cost) # add flight_cost
+   → Steps 2 and 3 are independent: issue BOTH tool calls together in ONE response so they run in parallel
+4. Once their results are back, extract costs and call budget_agent(hotel_cost, num_days, activities_cost, budget_level) # add flight_cost
+   → budget_level: 'budget' for cheap trips, 'luxury' for luxury trips, otherwise 'moderate'
 5. Compile everything into a complete plan
 
 **Final Output Format:**
@@ -72,8 +193,8 @@ Call the tools now to help the user!"""),
         ("placeholder", "{messages}")
     ])
     
-    # Bind the agent tools to the supervisor LLM
-    return supervisor_prompt | llm.bind_tools(agent_tools)
+    # Bind the agent tools to the supervisor LLM, allowing several tool calls per turn
+    return supervisor_prompt | llm.bind_tools(agent_tools, parallel_tool_calls=True)
 
 
 
@@ -0,0 +1,91 @@
+"""
+Tests for the accommodation agent's indexes and direct (no LLM) rankings.
+
+Run from the repository root:
+    python -m unittest discover -s tests
+"""
+
+import unittest
+
+from accommodation_agent import _direct_ranking, filter_by_amenities
+from constants import ACCOMMODATIONS_BY_CITY
+
+
+def _hotel_ids(response):
+    """Hotel ids from a search tool's table, in ranked order."""
+    return [row.split('|')[0] for row in response["table"].splitlines()]
+
+
+# ============================================
+# AMENITY INDEX
+# ============================================
+
+class FilterByAmenitiesTests(unittest.TestCase):
+    """filter_by_amenities matches words, full phrases and substrings."""
+
+    def search(self, destination, amenities):
+        return filter_by_amenities.invoke({
+            "destination": destination,
+            "required_amenities": amenities,
+            "check_in": "2026-11-01",
+            "check_out": "2026-11-04",
+        })
+
+    def test_all_amenities_required(self):
+        self.assertEqual(_hotel_ids(self.search("Tokyo", "Gym, Pool")), ["ACC003"])
+
+    def test_word_and_full_phrase(self):
+        self.assertEqual(_hotel_ids(self.search("Tokyo", "kitchen")), ["ACC002"])
+        self.assertEqual(_hotel_ids(self.search("tokyo", "Shared Kitchen")), ["ACC002"])
+
+    def test_substring_fallback(self):
+        self.assertEqual(sorted(_hotel_ids(self.search("Tokyo", "breakf"))), ["ACC001", "ACC003"])
+
+    def test_no_match(self):
+        response = self.search("Tokyo", "Sauna")
+        self.assertEqual(response["table"], "")
+        self.assertIn("error", response)
+
+    def test_other_city_not_matched(self):
+        self.assertEqual(sorted(_hotel_ids(self.search("Bali", "pool"))), ["ACC006", "ACC007"])
+
+
+# ============================================
+# DIRECT RANKING
+# ============================================
+
+class DirectRankingTests(unittest.TestCase):
+    """Single-keyword preferences are answered from the precomputed rankings."""
+
+    def test_cheapest(self):
+        hotels, _ = _direct_ranking("cheapest", "Tokyo")
+        self.assertEqual(hotels[0].price_per_night, min(h.price_per_night for h in ACCOMMODATIONS_BY_CITY["tokyo"]))
+
+    def test_luxury(self):
+        hotels, _ = _direct_ranking(" Luxury ", "tokyo")
+        self.assertEqual(hotels[0].rating, max(h.rating for h in ACCOMMODATIONS_BY_CITY["tokyo"]))
+
+    def test_balanced_differs_from_extremes(self):
+        balanced, _ = _direct_ranking("balanced", "Tokyo")
+        luxury, _ = _direct_ranking("luxury", "Tokyo")
+        cheapest, _ = _direct_ranking("cheapest", "Tokyo")
+        self.assertEqual(balanced[0].name, "Tokyo Central Hotel")
+        self.assertIsNot(balanced[0], luxury[0])
+        self.assertIsNot(balanced[0], cheapest[0])
+
+    def test_hotel_type_highest_rated_first(self):
+        hotels, _ = _direct_ranking("hotel", "Tokyo")
+        self.assertEqual([h.id for h in hotels], ["ACC003", "ACC001"])
+
+    def test_needs_llm(self):
+        self.assertIsNone(_direct_ranking("pool, gym", "Tokyo"))
+        # Known type with no match in the city: the LLM explains and suggests alternatives
+        self.assertIsNone(_direct_ranking("hostel", "Tokyo"))
+
+    def test_unknown_city(self):
+        hotels, _ = _direct_ranking("cheapest", "Atlantis")
+        self.assertEqual(hotels, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the shared ReAct loop step used by the specialist agents.
+
+Run from the repository root:
+    python -m unittest discover -s tests
+"""
+
+import json
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agent_loop import FINAL_ANSWER_NUDGE, final_answer, run_tool_calls
+
+
+class _CountingTool:
+    """Stand-in internal tool that records how often it runs."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, args):
+        self.calls += 1
+        return {"table": f"rows for {args['city']}", "tags": args.get("tags", [])}
+
+
+def _call(call_id, city, **extra):
+    return {"name": "search", "args": {"city": city, **extra}, "id": call_id}
+
+
+class RunToolCallsTests(unittest.TestCase):
+    """run_tool_calls caches results per run and nudges a looping agent."""
+
+    def setUp(self):
+        self.tool = _CountingTool()
+        self.tool_map = {"search": self.tool}
+        self.call_cache = {}
+
+    def run_turn(self, tool_calls, nudge=True):
+        return run_tool_calls(tool_calls, self.tool_map, self.call_cache, nudge=nudge)
+
+    def test_results_serialized_as_json(self):
+        messages = self.run_turn([_call("1", "Tokyo", tags=["food"])])
+        self.assertEqual(len(messages), 1)
+        self.assertIsInstance(messages[0], ToolMessage)
+        self.assertEqual(messages[0].tool_call_id, "1")
+        self.assertEqual(json.loads(messages[0].content), {"table": "rows for Tokyo", "tags": ["food"]})
+
+    def test_repeated_calls_reuse_results(self):
+        self.run_turn([_call("1", "Tokyo")])
+        messages = self.run_turn([_call("2", "Tokyo"), _call("3", "Paris")])
+        self.assertEqual(self.tool.calls, 2)
+        self.assertEqual([m.tool_call_id for m in messages], ["2", "3"])
+
+    def test_nudge_when_only_repeats(self):
+        self.run_turn([_call("1", "Tokyo")])
+        messages = self.run_turn([_call("2", "Tokyo")])
+        self.assertIsInstance(messages[-1], HumanMessage)
+        self.assertEqual(messages[-1].content, FINAL_ANSWER_NUDGE)
+
+    def test_no_nudge_when_disabled_or_new_data(self):
+        self.run_turn([_call("1", "Tokyo")])
+        self.assertEqual(len(self.run_turn([_call("2", "Tokyo")], nudge=False)), 1)
+        self.assertEqual(len(self.run_turn([_call("3", "Tokyo"), _call("4", "Rome")])), 2)
+
+    def test_unknown_tool_skipped(self):
+        messages = self.run_turn([{"name": "missing", "args": {}, "id": "1"}, _call("2", "Tokyo")])
+        self.assertEqual([m.tool_call_id for m in messages], ["2"])
+
+
+
+class FinalAnswerTests(unittest.TestCase):
+    """final_answer never hands back tool output as the agent's answer."""
+
+    def test_final_reply(self):
+        messages = [HumanMessage(content="task"), AIMessage(content="Stay at Hotel B")]
+        self.assertEqual(final_answer(messages, "fallback"), "Stay at Hotel B")
+
+    def test_fallback_when_loop_cut_off(self):
+        tool_call = _call("1", "Tokyo")
+        for messages in [
+            [HumanMessage(content="task"), AIMessage(content="", tool_calls=[tool_call]),
+             ToolMessage(content='{"table": "rows"}', tool_call_id="1", name="search")],
+            [HumanMessage(content="task"), AIMessage(content="Searching...", tool_calls=[tool_call])],
+            [HumanMessage(content="task"), AIMessage(content="")],
+            [],
+        ]:
+            with self.subTest(messages=messages):
+                self.assertEqual(final_answer(messages, "fallback"), "fallback")
+
+
+if __name__ == "__main__":
+    unittest.main()
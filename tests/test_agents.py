@@ -0,0 +1,376 @@
+"""
+Tests for the deterministic parts of the orchestration in agents.py.
+
+Run from the repository root:
+    python -m unittest discover -s tests
+"""
+
+import unittest
+from unittest import mock
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+import agents
+from agents import (
+    BoundedMemorySaver,
+    _ACTIVITIES_TOTAL_RE,
+    _budget_args,
+    _hotel_total,
+    _invoke_agent,
+    _user_budget,
+    build_travel_agent,
+    run_batch,
+    summary_node,
+    tool_node,
+)
+from accommodation_agent import accommodation_agent
+
+
+def _trip_turn(request="Plan 3 days in Tokyo, budget $1500", itinerary="Total Activities Cost: $85"):
+    """One user turn with real hotel output and a stand-in itinerary result."""
+    hotel_args = {
+        "destination": "Tokyo",
+        "check_in": "2026-11-01",
+        "check_out": "2026-11-04",
+        "guests": "1",
+        "preferences": "cheapest",
+    }
+    itinerary_args = {"destination": "Tokyo", "num_days": "3", "interests": "food"}
+    return [
+        HumanMessage(content=request),
+        AIMessage(content="", tool_calls=[
+            {"name": "accommodation_agent", "args": hotel_args, "id": "hotel_1"},
+            {"name": "itinerary_agent", "args": itinerary_args, "id": "itinerary_1"},
+        ]),
+        ToolMessage(
+            content=accommodation_agent.invoke(hotel_args),
+            tool_call_id="hotel_1",
+            name="accommodation_agent"
+        ),
+        ToolMessage(content=itinerary, tool_call_id="itinerary_1", name="itinerary_agent"),
+    ]
+
+
+class _CountingTool:
+    """Stand-in specialist agent that records how often it runs."""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, args):
+        self.calls.append(args)
+        return f"result for {args['destination']}"
+
+
+class _CityTool:
+    """Stand-in specialist agent whose answer names the requested city."""
+
+    def __init__(self, result):
+        self.result = result
+
+    def invoke(self, args):
+        return f"{args['destination']}: {self.result}"
+
+
+class _FixedTool:
+    """Stand-in specialist agent with a fixed answer (or error)."""
+
+    def __init__(self, result):
+        self.result = result
+
+    def invoke(self, args):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+# ============================================
+# COST EXTRACTION
+# ============================================
+
+class CostPatternTests(unittest.TestCase):
+    """The cost regexes match the specialist agents' output formats."""
+
+    def test_hotel_total(self):
+        text = "- Price: $450/night ($1,350 total for 3 nights)"
+        self.assertEqual(_hotel_total(text), "1350")
+        self.assertIsNone(_hotel_total("Hotel Le Marais: $180/night"))
+
+    def test_hotel_total_of_recommended_hotel(self):
+        text = (
+            "I compared Hotel A ($900 total) and Hotel B ($600 total).\n\n"
+            "🏨 RECOMMENDED ACCOMMODATION: Hotel B\n"
+            "- Price: $200/night ($600 total for 3 nights)\n\n"
+            "**Other options:**\n"
+            "- Hotel C: $100/night ($300 total)"
+        )
+        self.assertEqual(_hotel_total(text), "600")
+        # Without a heading, alternatives listed after the pick are still skipped
+        self.assertEqual(_hotel_total("Best pick: $600 total\nAlternatives: $300 total"), "600")
+
+    def test_activities_total(self):
+        for text in ["Total Activities Cost: $85", "**Total Activities Cost:** $1,050"]:
+            with self.subTest(text=text):
+                self.assertIsNotNone(_ACTIVITIES_TOTAL_RE.search(text))
+        self.assertEqual(_ACTIVITIES_TOTAL_RE.search("**Total Activities Cost:** $1,050").group(1), "1,050")
+
+    def test_budget_args_from_agent_results(self):
+        self.assertEqual(_budget_args(_trip_turn()), {
+            "hotel_cost": "135",
+            "num_days": "3",
+            "activities_cost": "85",
+            "user_budget": "1500",
+            "budget_level": "budget",
+        })
+
+    def test_budget_level_from_preference(self):
+        for preference, level in [("cheapest", "budget"), ("Luxury", "luxury"), ("balanced", "moderate"), ("pool", "moderate")]:
+            with self.subTest(preference=preference):
+                messages = _trip_turn()
+                messages[1].tool_calls[0]["args"]["preferences"] = preference
+                self.assertEqual(_budget_args(messages)["budget_level"], level)
+
+    def test_budget_args_without_budget_in_request(self):
+        args = _budget_args(_trip_turn(request="Plan a budget trip to Tokyo for 3 days"))
+        self.assertEqual(args["user_budget"], "0")
+
+    def test_budget_args_missing_cost(self):
+        self.assertIsNone(_budget_args(_trip_turn(itinerary="Day 1: Temple visit")))
+
+    def test_budget_args_missing_result(self):
+        self.assertIsNone(_budget_args(_trip_turn()[:-1]))
+
+    def test_budget_args_after_budget_agent(self):
+        messages = _trip_turn() + [
+            AIMessage(content="", tool_calls=[{"name": "budget_agent", "args": {}, "id": "budget_1"}]),
+            ToolMessage(content="💰 COMPLETE BUDGET BREAKDOWN", tool_call_id="budget_1", name="budget_agent"),
+        ]
+        self.assertIsNone(_budget_args(messages))
+
+    def test_budget_args_ignores_earlier_turns(self):
+        messages = _trip_turn() + [HumanMessage(content="Thanks! What about Paris?")]
+        self.assertIsNone(_budget_args(messages))
+
+
+# ============================================
+# SUMMARY
+# ============================================
+
+class SummaryNodeTests(unittest.TestCase):
+    """summary_node joins the current turn's results in display order."""
+
+    def test_sections_in_order(self):
+        messages = _trip_turn() + [
+            ToolMessage(content="💰 BUDGET", tool_call_id="budget_1", name="budget_agent"),
+        ]
+        plan = summary_node({"messages": messages})["messages"][0].content
+        sections = plan.split("\n\n")
+        self.assertEqual(sections[0], "✈️ YOUR TRAVEL PLAN")
+        self.assertTrue(sections[1].startswith("🏨 RECOMMENDED ACCOMMODATION: Sakura Guesthouse"))
+        self.assertLess(plan.index("Total Activities Cost"), plan.index("💰 BUDGET"))
+
+    def test_keeps_every_result(self):
+        messages = [
+            HumanMessage(content="Hotels in Tokyo and Paris"),
+            ToolMessage(content="🏨 Tokyo hotel", tool_call_id="hotel_1", name="accommodation_agent"),
+            ToolMessage(content="📅 Tokyo days", tool_call_id="itinerary_1", name="itinerary_agent"),
+            ToolMessage(content="🏨 Paris hotel", tool_call_id="hotel_2", name="accommodation_agent"),
+            ToolMessage(content="✈️ Flights", tool_call_id="flight_1", name="flight_agent"),
+        ]
+        plan = summary_node({"messages": messages})["messages"][0].content
+        self.assertEqual(plan.split("\n\n"), [
+            "✈️ YOUR TRAVEL PLAN", "🏨 Tokyo hotel", "🏨 Paris hotel", "📅 Tokyo days", "✈️ Flights",
+        ])
+
+    def test_only_current_turn(self):
+        messages = _trip_turn() + [
+            HumanMessage(content="And the budget?"),
+            ToolMessage(content="💰 BUDGET", tool_call_id="budget_2", name="budget_agent"),
+        ]
+        plan = summary_node({"messages": messages})["messages"][0].content
+        self.assertEqual(plan, "✈️ YOUR TRAVEL PLAN\n\n💰 BUDGET")
+
+
+# ============================================
+# TOOL DISPATCH
+# ============================================
+
+class ToolNodeTests(unittest.TestCase):
+    """tool_node runs identical calls once but answers every tool_call_id."""
+
+    def setUp(self):
+        _invoke_agent.cache_clear()
+        self.addCleanup(_invoke_agent.cache_clear)
+        self.tool = _CountingTool()
+        patcher = mock.patch.dict(agents.TOOL_MAP, {"accommodation_agent": self.tool})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_duplicate_calls_run_once(self):
+        tool_calls = [
+            {"name": "accommodation_agent", "args": {"destination": "Tokyo"}, "id": "a"},
+            {"name": "accommodation_agent", "args": {"destination": " Tokyo "}, "id": "b"},
+            {"name": "accommodation_agent", "args": {"destination": "Paris"}, "id": "c"},
+            {"name": "unknown_agent", "args": {}, "id": "d"},
+        ]
+        result = tool_node({"messages": [AIMessage(content="", tool_calls=tool_calls)]})
+        
+        self.assertEqual(len(self.tool.calls), 2)
+        self.assertEqual(
+            [(m.tool_call_id, m.content) for m in result["messages"]],
+            [("a", "result for Tokyo"), ("b", "result for Tokyo"), ("c", "result for Paris")]
+        )
+
+
+# ============================================
+# USER BUDGET PARSING
+# ============================================
+
+class UserBudgetTests(unittest.TestCase):
+    """_user_budget only picks up explicit amounts, never counts."""
+
+    def test_explicit_amounts(self):
+        cases = {
+            "Plan a 4-day trip to Tokyo, budget $1500": "1500",
+            "budget of 2,000 for 3 days": "2000",
+            "my budget is 1200 for 3 days": "1200",
+            "Budget: $3,500.50": "3500",
+            "budget of about 900": "900",
+            "I have $2k to spend": "2000",
+            "USD 2500 for everything": "2500",
+            "$150 per night, 3 nights, budget $900": "900",
+            "I have $1.5k to spend": "1500",
+            "my budget is 2.5k": "2500",
+            "Plan 3 days in Tokyo with budget 1500": "1500",
+            "1500 dollars budget for 3 days": "1500",
+            "Plan 3 days in Tokyo under 2000 USD": "2000",
+            "around 1,800 SGD in total": "1800",
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(_user_budget(text), expected)
+
+    def test_no_budget_amount(self):
+        for text in [
+            "Plan a budget trip to Tokyo for 4 days",
+            "budget-friendly for 2 people",
+            "on a budget, I love food",
+            "budget is 15 days",
+            "budget 15",
+            "budget: 2000 people",
+            "$150/night is my limit",
+            "Plan 3 days in Paris",
+        ]:
+            with self.subTest(text=text):
+                self.assertEqual(_user_budget(text), "0")
+
+
+# ============================================
+# CHECKPOINTER
+# ============================================
+
+class BoundedMemorySaverTests(unittest.TestCase):
+    """The saver keeps a bounded number of conversations."""
+
+    def put(self, saver, thread_id):
+        saver.put({"configurable": {"thread_id": thread_id}}, {"thread": thread_id})
+
+    def test_oldest_threads_evicted(self):
+        saver = BoundedMemorySaver(max_threads=2)
+        for thread_id in ["a", "b", "c"]:
+            self.put(saver, thread_id)
+        self.assertEqual(list(saver.storage), ["b", "c"])
+        
+        # Saving again makes a thread the most recent
+        self.put(saver, "b")
+        self.put(saver, "d")
+        self.assertEqual(list(saver.storage), ["b", "d"])
+
+    def test_forget(self):
+        saver = BoundedMemorySaver()
+        self.put(saver, "a")
+        saver.forget("a")
+        saver.forget("missing")
+        self.assertEqual(saver.storage, {})
+
+
+class CheckpointerTests(unittest.TestCase):
+    """Only completed graph runs are saved."""
+
+    def setUp(self):
+        _invoke_agent.cache_clear()
+        self.addCleanup(_invoke_agent.cache_clear)
+        self.graph = build_travel_agent()
+        self.config = {"configurable": {"thread_id": "test"}}
+
+    def run_graph(self, hotel_result):
+        tools = {
+            "accommodation_agent": _FixedTool(hotel_result),
+            "itinerary_agent": _FixedTool("Total Activities Cost: $85"),
+        }
+        with mock.patch.dict(agents.TOOL_MAP, tools):
+            # A plain trip request is parsed without the LLM
+            return self.graph.invoke({"messages": [HumanMessage(content="Plan 3 days in Tokyo")]}, self.config)
+
+    def test_completed_run_is_saved(self):
+        plan = self.run_graph("$135 total for 3 nights")["messages"][-1].content
+        self.assertTrue(plan.startswith("✈️ YOUR TRAVEL PLAN"))
+        self.assertIn("💰 COMPLETE BUDGET BREAKDOWN", plan)
+        saved = self.graph.checkpointer.get(self.config)["channel_values"]["messages"]
+        self.assertEqual(saved[-1].content, plan)
+
+    def test_failed_run_leaves_no_checkpoint(self):
+        with self.assertRaises(RuntimeError):
+            self.run_graph(RuntimeError("hotel search failed"))
+        self.assertIsNone(self.graph.checkpointer.get(self.config))
+
+
+
+# ============================================
+# BATCH PLANNING
+# ============================================
+
+class RunBatchTests(unittest.TestCase):
+    """run_batch returns plans in request order, one conversation per request."""
+
+    REQUESTS = ["Plan 3 days in Tokyo", "Plan 2 days in Paris", "Plan 4 days in Bali"]
+
+    def setUp(self):
+        _invoke_agent.cache_clear()
+        self.addCleanup(_invoke_agent.cache_clear)
+        tools = {
+            "accommodation_agent": _CityTool("$135 total for 3 nights"),
+            "itinerary_agent": _CityTool("Total Activities Cost: $85"),
+        }
+        patcher = mock.patch.dict(agents.TOOL_MAP, tools)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_in_request_order(self):
+        graph = build_travel_agent()
+        plans = run_batch(self.REQUESTS, max_workers=3, agent=graph)
+        
+        for plan, city in zip(plans, ["Tokyo", "Paris", "Bali"]):
+            with self.subTest(city=city):
+                self.assertIn(f"{city}: $135 total", plan)
+                self.assertIn(f"{city}: Total Activities Cost", plan)
+        
+        # Each request ran in its own thread, ending with its own plan
+        saved = [checkpoint["channel_values"]["messages"] for checkpoint in graph.checkpointer.storage.values()]
+        self.assertEqual(len(saved), len(self.REQUESTS))
+        self.assertCountEqual([messages[-1].content for messages in saved], plans)
+        self.assertTrue(all(sum(isinstance(m, HumanMessage) for m in messages) == 1 for messages in saved))
+
+    def test_graph_built_once(self):
+        agents._batch_agent.cache_clear()
+        self.addCleanup(agents._batch_agent.cache_clear)
+        with mock.patch.object(agents, "build_travel_agent", wraps=build_travel_agent) as build:
+            run_batch(self.REQUESTS[:1])
+            run_batch(self.REQUESTS[:1])
+        self.assertEqual(build.call_count, 1)
+        # A later batch starts a new conversation instead of continuing the first
+        self.assertEqual(len(agents._batch_agent().checkpointer.storage), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for the deterministic budget agent.
+
+Run from the repository root:
+    python -m unittest discover -s tests
+"""
+
+import unittest
+
+from budget_agent import _parse_amount, budget_agent, calculate_core_budget
+
+
+def _breakdown(**overrides):
+    args = {"hotel_cost": "300", "num_days": "3", "activities_cost": "100"}
+    return budget_agent.invoke({**args, **overrides})
+
+
+# ============================================
+# AMOUNT PARSING
+# ============================================
+
+class ParseAmountTests(unittest.TestCase):
+    """_parse_amount reads amounts as the LLM writes them, and reports missing ones."""
+
+    def test_amounts(self):
+        cases = {
+            "$1,200": 1200,
+            "1200.50": 1200,
+            "3 days": 3,
+            "USD 2,500 total": 2500,
+            "0": 0,
+            450: 450,
+            # A dash is never a minus sign
+            "-3 days": 3,
+            "- $200": 200,
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(_parse_amount(value), expected)
+
+    def test_missing(self):
+        for value in ["", "unknown", "N/A", None]:
+            with self.subTest(value=value):
+                self.assertIsNone(_parse_amount(value))
+
+    def test_core_budget_reports_missing_cost(self):
+        result = calculate_core_budget.invoke({"flights_cost": "0", "hotel_cost": "TBD", "activities_cost": "$50"})
+        self.assertIn("hotel cost 'TBD'", result["error"])
+        self.assertNotIn("core_total", result)
+        result = calculate_core_budget.invoke({"flights_cost": "TBD", "hotel_cost": "300", "activities_cost": "$50"})
+        self.assertIn("flights cost 'TBD'", result["error"])
+
+
+# ============================================
+# BUDGET AGENT
+# ============================================
+
+class BudgetAgentTests(unittest.TestCase):
+    """budget_agent costs the trip at the requested level and compares with the budget."""
+
+    def test_moderate_by_default(self):
+        breakdown = _breakdown()
+        self.assertIn("- Food & Dining: $180 ($60/day)", breakdown)
+        # 300 + 100 + 3 * (60 + 30) = 670, plus 10% buffer
+        self.assertIn("TOTAL TRIP COST: $737", breakdown)
+
+    def test_budget_levels(self):
+        self.assertIn("- Food & Dining: $120 ($40/day)", _breakdown(budget_level="budget"))
+        self.assertIn("- Local Transport: $150 ($50/day)", _breakdown(budget_level="luxury"))
+        self.assertIn("($60/day)", _breakdown(budget_level="unknown"))
+
+    def test_unreadable_cost_not_shown_as_zero(self):
+        breakdown = _breakdown(hotel_cost="unknown")
+        self.assertTrue(breakdown.startswith("💰 BUDGET NOT CALCULATED"))
+        self.assertIn("hotel cost 'unknown'", breakdown)
+        self.assertNotIn("$0", breakdown)
+
+    def test_flights_not_included(self):
+        self.assertIn("- Flights: not included", _breakdown())
+        breakdown = _breakdown(flights_cost="$400")
+        self.assertIn("- Flights: $400", breakdown)
+        # 737 without flights, plus 400 and its 10% buffer
+        self.assertIn("TOTAL TRIP COST: $1,177", breakdown)
+
+    def test_dash_is_not_negative(self):
+        self.assertIn("- Food & Dining: $180", _breakdown(num_days="-3 days"))
+
+    def test_budget_analysis(self):
+        self.assertNotIn("Budget Analysis", _breakdown())
+        self.assertNotIn("Budget Analysis", _breakdown(user_budget="N/A"))
+        self.assertIn("✅ Under budget by $263", _breakdown(user_budget="1,000"))
+        self.assertIn("⚠️ Over budget by $237", _breakdown(user_budget="$500"))
+
+
+if __name__ == "__main__":
+    unittest.main()
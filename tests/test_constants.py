@@ -0,0 +1,71 @@
+"""
+Tests for the shared configuration and data indexes in constants.py.
+
+Run from the repository root:
+    python -m unittest discover -s tests
+"""
+
+import unittest
+from unittest import mock
+
+from langchain_core.globals import get_llm_cache, set_llm_cache
+
+import constants
+from constants import BoundedLLMCache, enable_llm_cache
+
+
+# ============================================
+# LLM CACHE
+# ============================================
+
+class BoundedLLMCacheTests(unittest.TestCase):
+    """The LLM response cache stays within its size, evicting the least recently used."""
+
+    def test_evicts_least_recently_used(self):
+        cache = BoundedLLMCache(maxsize=2)
+        cache.update("a", "llm", ["A"])
+        cache.update("b", "llm", ["B"])
+        
+        # Looking up 'a' makes 'b' the least recently used
+        self.assertEqual(cache.lookup("a", "llm"), ["A"])
+        cache.update("c", "llm", ["C"])
+        
+        self.assertIsNone(cache.lookup("b", "llm"))
+        self.assertEqual(cache.lookup("a", "llm"), ["A"])
+        self.assertEqual(cache.lookup("c", "llm"), ["C"])
+
+    def test_keyed_by_prompt_and_model(self):
+        cache = BoundedLLMCache(maxsize=4)
+        cache.update("a", "llm-1", ["A1"])
+        self.assertIsNone(cache.lookup("a", "llm-2"))
+
+    def test_clear(self):
+        cache = BoundedLLMCache(maxsize=2)
+        cache.update("a", "llm", ["A"])
+        cache.clear()
+        self.assertIsNone(cache.lookup("a", "llm"))
+
+
+class EnableLLMCacheTests(unittest.TestCase):
+    """The cache is only installed on request, and only for deterministic sampling."""
+
+    def setUp(self):
+        self.addCleanup(set_llm_cache, get_llm_cache())
+        set_llm_cache(None)
+
+    def test_installed_once(self):
+        self.assertTrue(enable_llm_cache())
+        cache = get_llm_cache()
+        self.assertIsInstance(cache, BoundedLLMCache)
+        enable_llm_cache()
+        self.assertIs(get_llm_cache(), cache)
+
+    def test_off_when_sampling_or_disabled(self):
+        for setting, value in [("LLM_TEMPERATURE", 0.2), ("LLM_CACHE_SIZE", 0)]:
+            with self.subTest(setting=setting), mock.patch.object(constants, setting, value):
+                self.assertFalse(enable_llm_cache())
+                self.assertIsNone(get_llm_cache())
+
+
+if __name__ == "__main__":
+    unittest.main()
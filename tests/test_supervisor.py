@@ -0,0 +1,116 @@
+"""
+Tests for the supervisor's direct (no LLM) request parsing.
+
+Run from the repository root:
+    python -m unittest discover -s tests
+"""
+
+import unittest
+from datetime import date, timedelta
+
+from supervisor import parse_request
+
+
+def _args(text):
+    """(accommodation args, itinerary args) for a request the fast path accepts."""
+    calls = parse_request(text)
+    if calls is None:
+        raise AssertionError(f"request not parsed: {text!r}")
+    (hotel_name, hotel_args), (itinerary_name, itinerary_args) = calls
+    assert (hotel_name, itinerary_name) == ("accommodation_agent", "itinerary_agent")
+    return hotel_args, itinerary_args
+
+
+# ============================================
+# ACCEPTED REQUESTS
+# ============================================
+
+class ParseRequestTests(unittest.TestCase):
+    """Plain single-destination trips become the two specialist tool calls."""
+
+    def test_defaults(self):
+        hotel, itinerary = _args("Plan a 4-day trip to Tokyo, budget $1500")
+        check_in = date.today() + timedelta(days=30)
+        self.assertEqual(hotel, {
+            "destination": "Tokyo",
+            "check_in": check_in.isoformat(),
+            "check_out": (check_in + timedelta(days=4)).isoformat(),
+            "guests": "1",
+            "preferences": "balanced",
+        })
+        self.assertEqual(itinerary, {
+            "destination": "Tokyo",
+            "num_days": "4",
+            "interests": "sightseeing, food, culture",
+        })
+
+    def test_guests_and_interests(self):
+        hotel, itinerary = _args("Plan a 3-day trip to paris for 2 people, love food and Culture")
+        self.assertEqual(hotel["destination"], "Paris")
+        self.assertEqual(hotel["guests"], "2")
+        self.assertEqual(itinerary["interests"], "food, culture")
+
+    def test_singular_party_size(self):
+        for text in ["Plan 3 days in Tokyo for 1 adult", "Plan 3 days in Tokyo, 1 traveler", "Plan 3 days in Tokyo for 1 person"]:
+            with self.subTest(text=text):
+                self.assertEqual(_args(text)[0]["guests"], "1")
+
+    def test_may_is_not_a_date(self):
+        self.assertEqual(_args("Plan 3 days in Tokyo, it may be rainy")[1]["num_days"], "3")
+
+    def test_preferences(self):
+        self.assertEqual(_args("Cheap 5 day trip to Bangkok")[0]["preferences"], "cheapest")
+        self.assertEqual(_args("Plan 3 days in Tokyo on a budget")[0]["preferences"], "cheapest")
+        self.assertEqual(_args("Luxury 5 night vacation in Dubai")[0]["preferences"], "luxury")
+
+    def test_repeated_duration(self):
+        _, itinerary = _args("Plan a 3-day trip to Rome, 3 days of culture")
+        self.assertEqual(itinerary["num_days"], "3")
+
+    def test_multi_word_city(self):
+        self.assertEqual(_args("Plan 3 days in New York")[1]["destination"], "New York")
+
+
+# ============================================
+# REQUESTS LEFT TO THE LLM
+# ============================================
+
+class ParseRequestRejectTests(unittest.TestCase):
+    """Anything the fast path can't represent goes to the LLM supervisor."""
+
+    def test_rejected(self):
+        for text in [
+            # Not a clear trip request
+            "Hello there!",
+            "What's the weather in Tokyo?",
+            "Plan a trip to Tokyo",
+            "Plan 3 days in Tokyo and Paris",
+            "Plan 3 days in Atlantis",
+            # Dates (check-in is always today + 30 days)
+            "Plan a 3 day trip to Paris from 2026-12-20 to 2026-12-23",
+            "Plan a trip to Rome on March 3 for 4 nights",
+            "Plan 3 days in Tokyo, arriving 12/20",
+            "Plan 3 days in Tokyo next week",
+            "Plan a 3 day trip to Seoul this weekend",
+            "Plan 4 days in Bali starting Friday",
+            "Plan 3 days in Tokyo in 2 weeks",
+            "Plan 3 days in Tokyo from May 3",
+            "Plan a 3 day trip to Paris on the 3rd of May",
+            # Several durations
+            "Plan a trip to Tokyo in 10 days, stay 3 days",
+            "Plan a 4 day / 3 night trip to London",
+            # Interests to avoid
+            "Plan 4 days in Tokyo, no shopping please",
+            "Plan 4 days in Seoul, not into shopping but love food",
+            "Plan 3 days in Paris without any culture stuff",
+            # Several party sizes, or children (the party isn't just the count given)
+            "Plan 3 days in Bali for 2 kids and 2 adults",
+            "Plan 3 days in Tokyo with 2 kids",
+            "Plan a family trip to Paris for 4 days with my children",
+        ]:
+            with self.subTest(text=text):
+                self.assertIsNone(parse_request(text))
+
+
+if __name__ == "__main__":
+    unittest.main()